@@ -20,7 +20,7 @@
 # # - All processing is on-device; nothing leaves your machine.
 
 # # """
-from flask import Flask, request, render_template_string, jsonify
+from flask import Flask, request, render_template_string, jsonify, Response
 from datetime import datetime
 import re
 import os
@@ -29,12 +29,58 @@ from werkzeug.utils import secure_filename
 import docx
 import PyPDF2
 import io
-from collections import Counter
+import sys
+import hmac
+import hashlib
+import multiprocessing
+import time
+import random
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import Counter, OrderedDict, deque
+
+from result_format import BulkScores, NumpyUnavailable, Vocabulary
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 app.secret_key = 'career-intelligence-secret-key-2023'
+app.config['TENANT_TAXONOMY_FOLDER'] = 'tenants'
+app.config['TENANT_CACHE_MAX_BYTES'] = 16 * 1024 * 1024
+app.config['TENANT_CACHE_MAX_ENTRIES'] = 128
+app.config['PROFILE_ADMIN_TOKEN'] = os.environ.get('PROFILE_ADMIN_TOKEN', '')
+app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+app.config['PROFILE_BUFFER_SIZE'] = 50
+app.config['PROFILE_TOP_N'] = 15
+app.config['PDF_PARALLEL_MIN_PAGES'] = 16
+app.config['PDF_EXTRACT_WORKERS'] = int(os.environ.get('PDF_EXTRACT_WORKERS') or os.cpu_count() or 1)
+app.config['PDF_PAGE_CACHE_MAX_BYTES'] = 64 * 1024 * 1024
+app.config['PDF_PAGE_CACHE_MAX_ENTRIES'] = 20000
+app.config['DOCUMENT_CACHE_MAX_BYTES'] = 32 * 1024 * 1024
+app.config['DOCUMENT_CACHE_MAX_ENTRIES'] = 1024
+app.config['BULK_MAX_PAIRS'] = 250000
+app.config['ANALYTICS_MAX_JOBS'] = 1000
+app.config['ANALYTICS_MAX_APPLICANTS'] = 100000
+app.config['ANALYTICS_MAX_ID_LENGTH'] = 128
+# Weight of a matched skill by the resume section it was found in (best section wins).
+# Skill coverage itself is unweighted; weights above 1.0 (Experience, Projects) earn a
+# section bonus of at most SECTION_BONUS_MAX points on top of it.
+app.config['SECTION_BONUS_MAX'] = 10
+app.config['SECTION_SKILL_WEIGHTS'] = {
+    'experience': 1.25,
+    'projects': 1.1,
+    'summary': 1.0,
+    'skills': 1.0,
+    'education': 1.0,
+    'other': 1.0
+}
 
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
@@ -146,6 +192,455 @@ JOB_TITLES = {
     'qa engineer': ['qa engineer', 'quality assurance', 'test engineer']
 }
 
+def _word_boundary_at(text, index):
+    """Return True if a regex \\b boundary falls at text[index]"""
+    return bool(re.match(r'\w', text[index - 1])) != bool(re.match(r'\w', text[index]))
+
+def _compile_variations(variations_by_key):
+    """Compile {key: [variations]} into one regex plus a variation -> keys lookup"""
+    keys_by_variation = {}
+    for key, variations in variations_by_key.items():
+        for variation in variations:
+            keys_by_variation.setdefault(variation, set()).add(key)
+    
+    # At each position the alternation picks the longest variation that matches;
+    # shorter variations that would also have matched there are its prefixes
+    # ending on a word boundary, so fold their keys in ahead of time
+    lookup = {}
+    for variation, keys in keys_by_variation.items():
+        hits = set(keys)
+        for other, other_keys in keys_by_variation.items():
+            if len(other) < len(variation) and variation.startswith(other) and _word_boundary_at(variation, len(other)):
+                hits |= other_keys
+        lookup[variation] = frozenset(hits)
+    
+    if not lookup:
+        return None, lookup
+    alternation = '|'.join(re.escape(v) for v in sorted(lookup, key=len, reverse=True))
+    return re.compile(r'(?=\b(' + alternation + r')\b)'), lookup
+
+class TaxonomyMatcher:
+    """Skills and job title taxonomy compiled into single-pass matchers"""
+    
+    def __init__(self, skills_db, job_titles):
+        skill_variations = {}
+        for skills in skills_db.values():
+            for skill_key, variations in skills.items():
+                skill_variations.setdefault(skill_key, []).extend(variations)
+        self.skills_pattern, self.skills_lookup = _compile_variations(skill_variations)
+        self.titles_pattern, self.titles_lookup = _compile_variations(job_titles)
+        # Sorted key tables give stable integer ids for compact result formats
+        self.skill_names = tuple(sorted(skill_variations))
+        self.title_names = tuple(sorted(job_titles))
+        self.size = self._estimate_size()
+    
+    @staticmethod
+    def _find(pattern, lookup, text):
+        found = set()
+        if pattern is None:
+            return found
+        for match in pattern.finditer(text):
+            found |= lookup[match.group(1)]
+        return found
+    
+    def find_skills(self, text):
+        """Return skill keys found in preprocessed text"""
+        return self._find(self.skills_pattern, self.skills_lookup, text)
+    
+    def find_skill_sections(self, document):
+        """Return {skill key: set of section names} for a ParsedDocument in one pass"""
+        found = {}
+        if self.skills_pattern is None:
+            return found
+        for match in self.skills_pattern.finditer(document.text):
+            section = document.section_at(match.start())
+            for skill in self.skills_lookup[match.group(1)]:
+                found.setdefault(skill, set()).add(section)
+        return found
+    
+    def find_titles(self, text):
+        """Return job title keys found in preprocessed text"""
+        return self._find(self.titles_pattern, self.titles_lookup, text)
+    
+    def _estimate_size(self):
+        """Approximate memory footprint in bytes (compiled regex code is ~4x its pattern)"""
+        size = sys.getsizeof(self)
+        for pattern, lookup in ((self.skills_pattern, self.skills_lookup), (self.titles_pattern, self.titles_lookup)):
+            if pattern is not None:
+                size += 5 * sys.getsizeof(pattern.pattern)
+            size += sys.getsizeof(lookup)
+            size += sum(sys.getsizeof(v) + sys.getsizeof(keys) for v, keys in lookup.items())
+        return size
+
+def _is_string_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+def _is_variation_map(value):
+    return isinstance(value, dict) and all(
+        isinstance(key, str) and _is_string_list(variations) for key, variations in value.items())
+
+def validate_taxonomy_overlay(overlay):
+    """Raise ValueError describing the first problem in a tenant overlay"""
+    if not isinstance(overlay, dict):
+        raise ValueError("overlay must be a JSON object")
+    unknown = set(overlay) - {'skills', 'remove_skills', 'job_titles', 'remove_job_titles'}
+    if unknown:
+        raise ValueError(f"unknown overlay keys: {', '.join(sorted(unknown))}")
+    skills = overlay.get('skills', {})
+    if not isinstance(skills, dict) or not all(
+            isinstance(category, str) and _is_variation_map(entries) for category, entries in skills.items()):
+        raise ValueError('"skills" must map categories to {skill: [variations]}')
+    if not _is_variation_map(overlay.get('job_titles', {})):
+        raise ValueError('"job_titles" must map titles to [variations]')
+    for key in ('remove_skills', 'remove_job_titles'):
+        if not _is_string_list(overlay.get(key, [])):
+            raise ValueError(f'"{key}" must be a list of strings')
+
+def apply_taxonomy_overlay(overlay):
+    """Merge a tenant overlay into copies of SKILLS_DB and JOB_TITLES
+    
+    Overlay format:
+        {"skills": {"category": {"skill": ["variation", ...]}},
+         "remove_skills": ["skill", ...],
+         "job_titles": {"title": ["variation", ...]},
+         "remove_job_titles": ["title", ...]}
+    """
+    skills_db = {category: {key: list(variations) for key, variations in skills.items()}
+                 for category, skills in SKILLS_DB.items()}
+    job_titles = {key: list(variations) for key, variations in JOB_TITLES.items()}
+    
+    for category, skills in overlay.get('skills', {}).items():
+        target = skills_db.setdefault(category, {})
+        for key, variations in skills.items():
+            existing = target.setdefault(key.lower(), [])
+            existing.extend(v.lower() for v in variations if v.lower() not in existing)
+    for key in overlay.get('remove_skills', []):
+        for skills in skills_db.values():
+            skills.pop(key.lower(), None)
+    
+    for key, variations in overlay.get('job_titles', {}).items():
+        existing = job_titles.setdefault(key.lower(), [])
+        existing.extend(v.lower() for v in variations if v.lower() not in existing)
+    for key in overlay.get('remove_job_titles', []):
+        job_titles.pop(key.lower(), None)
+    
+    return skills_db, job_titles
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by approximate bytes and entry count
+    
+    Limits are read from app.config on every insert so they can be tuned at runtime.
+    """
+    
+    def __init__(self, max_bytes_setting, max_entries_setting, sizeof):
+        self.max_bytes_setting = max_bytes_setting
+        self.max_entries_setting = max_entries_setting
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def lookup(self, key):
+        """Return the cached value or None, counting the hit or miss"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+            return None
+    
+    def peek(self, key):
+        """Return the cached value or None without counting; for callers that probe several keys"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def count(self, hits, misses):
+        """Record the outcome of lookups made with peek"""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+    
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                del self._entries[key]
+                self._bytes -= self._sizes.pop(key)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            self._evict()
+    
+    def get(self, key, build):
+        """Return the cached value, building and inserting it on a miss"""
+        value = self.lookup(key)
+        if value is None:
+            # Build outside the lock so other keys are not blocked
+            value = build()
+            self.put(key, value)
+        return value
+    
+    def _evict(self):
+        max_bytes = app.config[self.max_bytes_setting]
+        max_entries = app.config[self.max_entries_setting]
+        # Always keep the most recent entry, even if it alone exceeds the budget
+        while len(self._entries) > 1 and (self._bytes > max_bytes or len(self._entries) > max_entries):
+            key, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(key)
+            self.evictions += 1
+    
+    def invalidate(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._bytes -= self._sizes.pop(key)
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": app.config[self.max_bytes_setting],
+                "max_entries": app.config[self.max_entries_setting],
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+# Default matcher built from the global taxonomy; shared by requests without a tenant
+BASE_MATCHER = TaxonomyMatcher(SKILLS_DB, JOB_TITLES)
+
+# In-memory tenant overlays; tenants not registered here are loaded from TENANT_TAXONOMY_FOLDER
+TENANT_OVERLAYS = {}
+MATCHER_CACHE = LRUCache('TENANT_CACHE_MAX_BYTES', 'TENANT_CACHE_MAX_ENTRIES', lambda matcher: matcher.size)
+TENANT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_\-]{1,64}$')
+
+def register_tenant_taxonomy(tenant_id, overlay):
+    """Register or replace a tenant overlay and drop its compiled matcher
+    
+    Raises ValueError if the overlay is malformed.
+    """
+    validate_taxonomy_overlay(overlay)
+    TENANT_OVERLAYS[tenant_id] = overlay
+    MATCHER_CACHE.invalidate((tenant_id, None))
+
+def sync_tenant_overlays(overlays):
+    """Make this process's registered overlays match another process's TENANT_OVERLAYS
+    
+    Used by asgi.py process workers, which receive the serving process's registrations
+    with every job. Unchanged overlays keep their compiled matchers.
+    """
+    for tenant_id in set(TENANT_OVERLAYS) - set(overlays):
+        del TENANT_OVERLAYS[tenant_id]
+        MATCHER_CACHE.invalidate((tenant_id, None))
+    for tenant_id, overlay in overlays.items():
+        if TENANT_OVERLAYS.get(tenant_id) != overlay:
+            TENANT_OVERLAYS[tenant_id] = overlay
+            MATCHER_CACHE.invalidate((tenant_id, None))
+
+def tenant_overlay_path(tenant_id):
+    return os.path.join(app.config['TENANT_TAXONOMY_FOLDER'], f"{tenant_id}.json")
+
+def load_tenant_overlay(tenant_id):
+    """Return the overlay for a tenant, or None if the tenant is unknown
+    
+    Raises ValueError if the tenant's overlay file cannot be read or is malformed.
+    """
+    if tenant_id in TENANT_OVERLAYS:
+        return TENANT_OVERLAYS[tenant_id]
+    path = tenant_overlay_path(tenant_id)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as fh:
+            overlay = json.load(fh)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"cannot read {path}: {e}") from e
+    try:
+        validate_taxonomy_overlay(overlay)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from e
+    return overlay
+
+def get_matcher(tenant_id=None):
+    """Return the compiled matcher for a tenant (None selects the base taxonomy)
+    
+    Raises KeyError for an unknown tenant and ValueError for a malformed overlay.
+    """
+    if not tenant_id:
+        return BASE_MATCHER
+    if not TENANT_ID_PATTERN.match(tenant_id):
+        raise KeyError(tenant_id)
+    
+    # Overlay files are keyed by modification time and size, so an edited file is picked up
+    # on the next request; registered overlays are invalidated when they are replaced
+    version = None
+    if tenant_id not in TENANT_OVERLAYS:
+        try:
+            stat = os.stat(tenant_overlay_path(tenant_id))
+        except OSError:
+            raise KeyError(tenant_id) from None
+        version = (stat.st_mtime_ns, stat.st_size)
+    
+    def build():
+        overlay = load_tenant_overlay(tenant_id)
+        if overlay is None:
+            raise KeyError(tenant_id)
+        return TaxonomyMatcher(*apply_taxonomy_overlay(overlay))
+    
+    return MATCHER_CACHE.get((tenant_id, version), build)
+
+# PDF page text cache, keyed by (document hash, page index) and by page content fingerprint
+PDF_PAGE_CACHE = LRUCache('PDF_PAGE_CACHE_MAX_BYTES', 'PDF_PAGE_CACHE_MAX_ENTRIES', sys.getsizeof)
+_pdf_executor = None
+_pdf_executor_lock = threading.Lock()
+
+class _PdfObjectHasher:
+    """Content hashes of PDF objects within one document, memoised per indirect object
+    
+    Raises ValueError on reference cycles so callers can give up on a content key
+    rather than hash an incomplete tree.
+    """
+    
+    def __init__(self):
+        self.memo = {}
+        self.active = set()
+    
+    def digest(self, obj):
+        if isinstance(obj, PyPDF2.generic.IndirectObject):
+            key = (obj.idnum, obj.generation)
+            if key in self.memo:
+                return self.memo[key]
+            if key in self.active:
+                raise ValueError("reference cycle")
+            self.active.add(key)
+            try:
+                result = self.digest(obj.get_object())
+            finally:
+                self.active.discard(key)
+            self.memo[key] = result
+            return result
+        
+        digest = hashlib.sha256()
+        if isinstance(obj, dict):
+            # Streams hash their dictionary (nested /Resources of form XObjects included) and their data
+            digest.update(b'S' if isinstance(obj, PyPDF2.generic.StreamObject) else b'D')
+            # dict.items keeps indirect references unresolved (DictionaryObject.__getitem__ resolves
+            # them), so objects shared between pages, such as embedded fonts, hit the memo
+            for key, value in sorted(dict.items(obj)):
+                # /Parent points back up the page tree, which extraction does not read from resources
+                if key == '/Parent':
+                    continue
+                digest.update(str(key).encode() + b'=' + self.digest(value).encode() + b';')
+            if isinstance(obj, PyPDF2.generic.StreamObject):
+                digest.update(obj.get_data())
+        elif isinstance(obj, list):
+            digest.update(b'A')
+            for item in obj:
+                digest.update(self.digest(item).encode() + b';')
+        else:
+            digest.update(f"{type(obj).__name__}:{obj!r}".encode())
+        return digest.hexdigest()
+
+def _inherited(page, key):
+    """Look up a page attribute, following /Parent like PyPDF2 does for /Resources"""
+    node = page
+    while key not in node and '/Parent' in node:
+        node = node['/Parent'].get_object()
+    return node.get(key)
+
+def pdf_page_fingerprint(page, hasher):
+    """Hash everything extract_text reads: contents, the full resource tree and /Rotate
+    
+    The resource tree includes form XObjects with their own nested resources, since
+    PyPDF2 extracts text from them via Do. Identical pages get the same key in a
+    different document, e.g. when a page is appended to a previously uploaded CV.
+    Returns None when the tree cannot be hashed completely.
+    """
+    try:
+        digest = hashlib.sha256()
+        for key in ('/Contents', '/Resources', '/Rotate'):
+            value = page.get(key) if key == '/Contents' else _inherited(page, key)
+            digest.update(key.encode() + b'=' + hasher.digest(value).encode() + b';')
+        return digest.hexdigest()
+    except Exception:
+        return None
+
+def _extract_pdf_pages(data, page_numbers):
+    """Extract text for the given pages of a PDF (runs in a worker process)"""
+    pages = PyPDF2.PdfReader(io.BytesIO(data)).pages
+    return [pages[n].extract_text() for n in page_numbers]
+
+def _get_pdf_executor():
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            # spawn avoids forking a multi-threaded server process
+            _pdf_executor = ProcessPoolExecutor(
+                max_workers=app.config['PDF_EXTRACT_WORKERS'],
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pdf_executor
+
+def _reset_pdf_executor():
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is not None:
+            _pdf_executor.shutdown(wait=False, cancel_futures=True)
+            _pdf_executor = None
+
+def extract_pdf_text(data):
+    """Extract PDF text page by page, reusing cached pages and parallelising large documents"""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    document_hash = hashlib.sha256(data).hexdigest()
+    # The document key is exact and cheap, so a re-upload never hashes page resources
+    document_keys = [('document', document_hash, n) for n in range(len(reader.pages))]
+    texts = [PDF_PAGE_CACHE.peek(key) for key in document_keys]
+    # The content key lets unchanged pages of an edited document hit
+    hasher = _PdfObjectHasher()
+    content_keys = {}
+    for n, text in enumerate(texts):
+        if text is None:
+            content_keys[n] = pdf_page_fingerprint(reader.pages[n], hasher)
+            if content_keys[n] is not None:
+                texts[n] = PDF_PAGE_CACHE.peek(('content', content_keys[n]))
+    pending = [n for n, text in enumerate(texts) if text is None]
+    # One hit or miss per page, whichever key answered
+    PDF_PAGE_CACHE.count(len(texts) - len(pending), len(pending))
+    
+    workers = app.config['PDF_EXTRACT_WORKERS']
+    if len(pending) >= app.config['PDF_PARALLEL_MIN_PAGES'] and workers > 1:
+        # Contiguous page ranges, one per worker, reassembled in order
+        chunk = -(-len(pending) // workers)
+        ranges = [pending[i:i + chunk] for i in range(0, len(pending), chunk)]
+        try:
+            executor = _get_pdf_executor()
+            futures = [executor.submit(_extract_pdf_pages, data, page_range) for page_range in ranges]
+            extracted = [text for future in futures for text in future.result()]
+        except BrokenProcessPool:
+            _reset_pdf_executor()
+            extracted = [reader.pages[n].extract_text() for n in pending]
+    else:
+        extracted = [reader.pages[n].extract_text() for n in pending]
+    
+    for n, text in zip(pending, extracted):
+        texts[n] = text
+        PDF_PAGE_CACHE.put(document_keys[n], text)
+        if content_keys[n] is not None:
+            PDF_PAGE_CACHE.put(('content', content_keys[n]), text)
+    
+    return ''.join(texts)
+
 def extract_text_from_file(file):
     """Extract text from various file types"""
     if not file or file.filename == '':
@@ -156,11 +651,7 @@ def extract_text_from_file(file):
     
     try:
         if file_ext == 'pdf':
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
+            return extract_pdf_text(file.read())
         
         elif file_ext == 'docx':
             doc = docx.Document(io.BytesIO(file.read()))
@@ -190,44 +681,132 @@ def preprocess_text(text):
     
     return text.strip()
 
-def extract_skills(text):
+# Resume section segmentation
+SECTION_NAMES = ('other', 'summary', 'experience', 'skills', 'education', 'projects')
+SECTION_HEADINGS = {
+    'summary': ['summary', 'professional summary', 'profile', 'professional profile', 'objective',
+                'career objective', 'about me'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'career history'],
+    'skills': ['skills', 'technical skills', 'key skills', 'core skills', 'core competencies',
+               'competencies', 'technologies', 'skills and tools', 'tools and technologies'],
+    'education': ['education', 'academic background', 'education and training', 'certifications',
+                  'education and certifications'],
+    'projects': ['projects', 'personal projects', 'key projects', 'selected projects', 'academic projects']
+}
+HEADING_LOOKUP = {alias: SECTION_NAMES.index(section)
+                  for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+# Sections searched for years of experience in a resume
+EXPERIENCE_SECTIONS = ('summary', 'experience')
+
+class ParsedDocument:
+    """Normalized text plus a compact section offset index
+    
+    offsets holds five integers per section: section id, raw start, raw end,
+    normalized start, normalized end.
+    """
+    __slots__ = ('text', 'offsets', '_norm_starts')
+    
+    def __init__(self, text, offsets):
+        self.text = text
+        self.offsets = offsets
+        self._norm_starts = offsets[3::5]
+    
+    def sections(self):
+        """Yield (name, raw start, raw end, normalized start, normalized end)"""
+        for i in range(0, len(self.offsets), 5):
+            yield (SECTION_NAMES[self.offsets[i]],) + tuple(self.offsets[i + 1:i + 5])
+    
+    def section_at(self, pos):
+        """Name of the section containing a normalized text position"""
+        i = max(bisect_right(self._norm_starts, pos) - 1, 0)
+        return SECTION_NAMES[self.offsets[i * 5]] if self.offsets else 'other'
+    
+    def spans(self, names):
+        """Normalized text slices for the given section names"""
+        return [self.text[start:end] for name, _, _, start, end in self.sections()
+                if name in names and end > start]
+    
+    @property
+    def size(self):
+        return sys.getsizeof(self.text) + sys.getsizeof(self.offsets) + sys.getsizeof(self._norm_starts)
+
+def _heading_section(line):
+    """Return the section id if a line is a section heading, else None"""
+    if len(line) > 40:
+        return None
+    key = re.sub(r'[^a-z& ]', '', line.lower()).replace('&', 'and')
+    return HEADING_LOOKUP.get(' '.join(key.split()))
+
+def segment_sections(raw_text):
+    """Single pass over the raw lines, returning [(section id, raw start, raw end)]"""
+    sections = []
+    current, start, pos = 0, 0, 0
+    for line in raw_text.splitlines(keepends=True):
+        section = _heading_section(line.strip())
+        if section is not None:
+            if pos > start:
+                sections.append((current, start, pos))
+            current, start = section, pos
+        pos += len(line)
+    if pos > start or not sections:
+        sections.append((current, start, pos))
+    return sections
+
+def build_document(raw_text):
+    """Segment raw text, then normalize it section by section
+    
+    Joining the normalized sections with single spaces gives exactly
+    preprocess_text(raw_text), so normalized offsets line up with the text.
+    """
+    pieces = []
+    offsets = array('I')
+    length = 0
+    for section, raw_start, raw_end in segment_sections(raw_text):
+        piece = preprocess_text(raw_text[raw_start:raw_end])
+        if piece and pieces:
+            length += 1
+        offsets.extend((section, raw_start, raw_end, length, length + len(piece)))
+        if piece:
+            pieces.append(piece)
+            length += len(piece)
+    return ParsedDocument(' '.join(pieces), offsets)
+
+DOCUMENT_CACHE = LRUCache('DOCUMENT_CACHE_MAX_BYTES', 'DOCUMENT_CACHE_MAX_ENTRIES', lambda document: document.size)
+
+def parse_document(raw_text):
+    """Return the cached ParsedDocument for a text, building it on first use"""
+    key = hashlib.sha1(raw_text.encode('utf-8', 'surrogatepass')).hexdigest()
+    return DOCUMENT_CACHE.get(key, lambda: build_document(raw_text))
+
+def extract_skills(text, matcher=None):
     """Advanced skill extraction with context awareness"""
-    found_skills = set()
     text = preprocess_text(text)
     
     if not text:
-        return found_skills
-    
-    # Multi-pass approach for better matching
-    for category, skills in SKILLS_DB.items():
-        for skill_key, skill_variations in skills.items():
-            for variation in skill_variations:
-                # Use word boundary regex to find matches
-                if re.search(r'\b' + re.escape(variation) + r'\b', text):
-                    found_skills.add(skill_key)
-                    break
+        return set()
     
-    return found_skills
+    # Single pass over the text with the compiled taxonomy
+    return (matcher or BASE_MATCHER).find_skills(text)
 
-def extract_job_titles(text):
+def extract_job_titles(text, matcher=None):
     """Extract job titles from text with context awareness"""
-    found_titles = set()
     text = preprocess_text(text)
     
     if not text:
-        return found_titles
+        return set()
     
-    for title_key, title_variations in JOB_TITLES.items():
-        for variation in title_variations:
-            if re.search(r'\b' + re.escape(variation) + r'\b', text):
-                found_titles.add(title_key)
-                break
-    
-    return found_titles
+    return (matcher or BASE_MATCHER).find_titles(text)
 
-def extract_experience_level(text):
-    """Extract experience level requirements"""
-    text = preprocess_text(text)
+def extract_experience_level(text, sections=None):
+    """Extract experience level requirements
+    
+    With sections, only those spans of the parsed document are searched
+    (falling back to the whole text when none of them are present).
+    """
+    document = parse_document(text)
+    texts = document.spans(sections) if sections else []
+    texts = texts or [document.text]
     experience_patterns = [
         (r'(\d+)[\+]?\s*(years|yrs)\s*(experience|exp)', 1),
         (r'(senior|lead|principal)\s+(\w+\s+)*\w+', 0),
@@ -237,7 +816,7 @@ def extract_experience_level(text):
     
     experience_level = "Not specified"
     for pattern, group in experience_patterns:
-        match = re.search(pattern, text)
+        match = next(filter(None, (re.search(pattern, t) for t in texts)), None)
         if match:
             if group == 0:
                 experience_level = match.group(0)
@@ -247,54 +826,76 @@ def extract_experience_level(text):
     
     return experience_level
 
-def calculate_match(resume_text, jd_text):
-    """Advanced matching algorithm with multiple factors"""
-    if not resume_text or not jd_text:
-        return 0, [], [], [], [], "Not specified"
-    
-    # Extract skills from both texts
-    resume_skills = extract_skills(resume_text)
-    jd_skills = extract_skills(jd_text)
-    
-    # Extract job titles from JD
-    jd_titles = extract_job_titles(jd_text)
-    resume_titles = extract_job_titles(resume_text)
-    
-    # Extract experience level
-    experience_level = extract_experience_level(jd_text)
+class DocumentFeatures:
+    """Matching features of one document, extracted once and reusable across pairs"""
+    __slots__ = ('document', 'skill_sections', 'skills', 'titles', 'experience_level')
     
+    def __init__(self, text, matcher, experience_sections=None):
+        # Normalized once and cached with its section index
+        self.document = parse_document(text)
+        # Skills are attributed to the sections they were found in
+        self.skill_sections = matcher.find_skill_sections(self.document)
+        self.skills = set(self.skill_sections)
+        self.titles = matcher.find_titles(self.document.text)
+        self.experience_level = extract_experience_level(text, experience_sections)
+
+def score_match(resume, jd):
+    """Score resume features against job description features"""
     # Calculate multiple match factors
     # Skill-based matching
-    matched_skills = resume_skills & jd_skills
-    missing_skills = jd_skills - resume_skills
-    extra_skills = resume_skills - jd_skills
+    matched_skills = resume.skills & jd.skills
     
     # Title matching bonus
-    title_match_bonus = 15 if jd_titles and resume_titles and jd_titles & resume_titles else 0
+    title_match_bonus = 15 if jd.titles and resume.titles and jd.titles & resume.titles else 0
     
     # Experience level consideration
     experience_bonus = 5
     
     # Calculate comprehensive match score
+    section_bonus = 0
     # If no specific skills in JD, use keyword matching instead
-    if not jd_skills:
+    if not jd.skills:
         # Fallback to keyword matching
-        jd_words = set(preprocess_text(jd_text).split())
-        resume_words = set(preprocess_text(resume_text).split())
+        jd_words = set(jd.document.text.split())
+        resume_words = set(resume.document.text.split())
         common_words = jd_words & resume_words
         # Remove common unimportant words
         common_words = {word for word in common_words if len(word) > 4 and word not in [
             'experience', 'years', 'development', 'software', 'engineer', 'developer'
         ]}
-        match_score = min(len(common_words) * 5, 80)  # Max 80% for keyword matching
+        base_score = min(len(common_words) * 5, 80)  # Max 80% for keyword matching
     else:
-        skill_match_ratio = len(matched_skills) / len(jd_skills) if jd_skills else 0
+        skill_match_ratio = len(matched_skills) / len(jd.skills)
         base_score = skill_match_ratio * 80  # 80% max for skills
+        
+        # Matched skills demonstrated in a weighted section (best section wins) earn a separate,
+        # capped bonus; a skill's share of it is below its share of base_score, so a missing
+        # skill always costs points
+        weights = app.config['SECTION_SKILL_WEIGHTS']
+        boost = sum(max(weights.get(section, 1.0) for section in resume.skill_sections[skill]) - 1.0
+                    for skill in matched_skills)
+        section_bonus = min(boost / len(jd.skills) * 80, app.config['SECTION_BONUS_MAX'])
     
     # Add bonuses
-    match_score = min(int(base_score + title_match_bonus + experience_bonus), 100)
+    return min(int(base_score + section_bonus + title_match_bonus + experience_bonus), 100)
+
+def calculate_match(resume_text, jd_text, matcher=None):
+    """Advanced matching algorithm with multiple factors"""
+    if not resume_text or not jd_text:
+        return 0, [], [], [], [], "Not specified", {}, "Not specified"
+    
+    matcher = matcher or BASE_MATCHER
+    resume = DocumentFeatures(resume_text, matcher, EXPERIENCE_SECTIONS)
+    jd = DocumentFeatures(jd_text, matcher)
     
-    return match_score, list(matched_skills), list(missing_skills), list(extra_skills), list(jd_titles), experience_level
+    match_score = score_match(resume, jd)
+    matched_skills = resume.skills & jd.skills
+    missing_skills = jd.skills - resume.skills
+    extra_skills = resume.skills - jd.skills
+    
+    skill_sections = {skill: sorted(sections) for skill, sections in resume.skill_sections.items()}
+    return (match_score, list(matched_skills), list(missing_skills), list(extra_skills), list(jd.titles),
+            jd.experience_level, skill_sections, resume.experience_level)
 
 def generate_keyword_heatmap(resume_text, jd_text):
     """Generate keyword frequency data for heatmap visualization"""
@@ -302,8 +903,8 @@ def generate_keyword_heatmap(resume_text, jd_text):
         return []
     
     # Extract words from both texts (longer words are more meaningful)
-    resume_words = [word for word in preprocess_text(resume_text).split() if len(word) > 4]
-    jd_words = [word for word in preprocess_text(jd_text).split() if len(word) > 4]
+    resume_words = [word for word in parse_document(resume_text).text.split() if len(word) > 4]
+    jd_words = [word for word in parse_document(jd_text).text.split() if len(word) > 4]
     
     # Count frequencies
     resume_freq = Counter(resume_words)
@@ -329,6 +930,256 @@ def generate_keyword_heatmap(resume_text, jd_text):
     
     return heatmap_data
 
+# Per-request profiling (opt-in via admin header or sampling)
+PROFILES = deque(maxlen=app.config['PROFILE_BUFFER_SIZE'])
+PROFILES_LOCK = threading.Lock()
+# cProfile and tracemalloc are process-wide, so only one request is profiled at a time
+PROFILE_ACTIVE = threading.Lock()
+
+def has_admin_token(headers):
+    """Check the X-Profile-Token header against the configured admin token"""
+    token = app.config['PROFILE_ADMIN_TOKEN']
+    supplied = headers.get('X-Profile-Token', '')
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+def profile_reason(headers):
+    """Return why this request should be profiled, or None
+    
+    Profiling is disabled unless PROFILE_ADMIN_TOKEN is set, since nobody could read the results.
+    """
+    if not app.config['PROFILE_ADMIN_TOKEN']:
+        return None
+    if has_admin_token(headers):
+        return "header"
+    rate = app.config['PROFILE_SAMPLE_RATE']
+    if rate > 0 and random.random() < rate:
+        return "sampled"
+    return None
+
+class RequestProfile:
+    """cProfile and tracemalloc results for one request, recorded per stage"""
+    
+    def __init__(self, reason, **meta):
+        self.reason = reason
+        self.meta = meta
+        self.stages = []
+        self.started = time.perf_counter()
+        self.top_n = app.config['PROFILE_TOP_N']
+    
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ))
+    
+    @contextmanager
+    def stage(self, name):
+        before = self._snapshot()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            after = self._snapshot()
+            self.stages.append({
+                "stage": name,
+                "elapsed_ms": round(elapsed * 1000, 3),
+                "top_functions": self._top_functions(profiler),
+                "top_allocations": self._top_allocations(before, after)
+            })
+    
+    def _top_functions(self, profiler):
+        stats = pstats.Stats(profiler).stats
+        rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top_n]
+        return [{
+            "function": f"{os.path.basename(filename)}:{line}({func})",
+            "calls": calls,
+            "total_ms": round(tottime * 1000, 3),
+            "cumulative_ms": round(cumtime * 1000, 3)
+        } for (filename, line, func), (_, calls, tottime, cumtime, _) in rows]
+    
+    def _top_allocations(self, before, after):
+        diffs = [d for d in after.compare_to(before, 'lineno') if d.size_diff > 0][:self.top_n]
+        return [{
+            "site": f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+            "size_kb": round(d.size_diff / 1024, 2),
+            "count": d.count_diff
+        } for d in diffs]
+    
+    def to_dict(self):
+        return {
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "reason": self.reason,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            **self.meta,
+            "stages": self.stages
+        }
+
+def record_profile(profile_dict):
+    """Append a finished profile to the ring buffer"""
+    with PROFILES_LOCK:
+        PROFILES.append(profile_dict)
+
+@contextmanager
+def request_profiling(reason, record=True, **meta):
+    """Profile the enclosed request if reason is set; yields a RequestProfile or None
+    
+    Requests arriving while another one is being profiled run unprofiled.
+    """
+    if not reason or not PROFILE_ACTIVE.acquire(blocking=False):
+        yield None
+        return
+    
+    profile = RequestProfile(reason, **meta)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        yield profile
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        profile.result = profile.to_dict()
+        if record:
+            record_profile(profile.result)
+        PROFILE_ACTIVE.release()
+
+def profile_stage(profile, name):
+    """Stage context for an optional profile"""
+    return profile.stage(name) if profile else nullcontext()
+
+# Skill-gap analytics, aggregated incrementally as analyses are recorded
+SCORE_BUCKETS = 10
+
+class SkillGapAggregate:
+    """Running counters for a set of analyses (one job, or a tenant's whole pool)"""
+    
+    def __init__(self):
+        self.analyses = 0
+        self.score_sum = 0
+        self.score_histogram = [0] * SCORE_BUCKETS
+        self.required = Counter()
+        self.missing = Counter()
+        self.matched = Counter()
+        self.applicant_skills = Counter()
+    
+    def add(self, contribution, sign=1):
+        """Add (sign=1) or retract (sign=-1) one analysis"""
+        score, matched, missing, extra = contribution
+        self.analyses += sign
+        self.score_sum += sign * score
+        self.score_histogram[min(score * SCORE_BUCKETS // 100, SCORE_BUCKETS - 1)] += sign
+        for counter, skills in ((self.required, matched | missing), (self.missing, missing),
+                                (self.matched, matched), (self.applicant_skills, matched | extra)):
+            counter.update({skill: sign for skill in skills})
+    
+    def summary(self, top=10):
+        # Counters are bounded by the skills vocabulary, so this does not grow with the number of analyses
+        def ranked(counter):
+            return [{"skill": skill, "count": count,
+                     "rate": count / self.analyses if self.analyses else 0.0}
+                    # Unary + drops skills whose count fell back to zero after a retraction
+                    for skill, count in (+counter).most_common(top)]
+        
+        return {
+            "analyses": self.analyses,
+            "mean_score": self.score_sum / self.analyses if self.analyses else 0.0,
+            "score_histogram": [{"range": f"{i * 100 // SCORE_BUCKETS}-{(i + 1) * 100 // SCORE_BUCKETS}", "count": count}
+                                for i, count in enumerate(self.score_histogram)],
+            "top_missing_skills": ranked(self.missing),
+            "top_required_skills": ranked(self.required),
+            "top_applicant_skills": ranked(self.applicant_skills),
+            "gap_rates": {skill: self.missing[skill] / count
+                          for skill, count in self.required.items() if count > 0}
+        }
+
+def analytics_id_error(job_id, applicant_id):
+    """Error message for job/applicant ids that are too long to be kept as analytics keys"""
+    limit = app.config['ANALYTICS_MAX_ID_LENGTH']
+    if len(job_id or '') > limit or len(applicant_id or '') > limit:
+        return f"job_id and applicant_id must be at most {limit} characters"
+    return None
+
+class SkillGapAnalytics:
+    """Per-job and pool-wide skill-gap aggregates, scoped by tenant
+    
+    Jobs and per-applicant contributions are kept in LRU order and capped by
+    ANALYTICS_MAX_JOBS and ANALYTICS_MAX_APPLICANTS. An evicted job drops its
+    aggregate and applicants; its analyses stay counted in the tenant pool.
+    """
+    
+    def __init__(self):
+        self.pools = {}
+        self.jobs = OrderedDict()
+        # Last contribution per (tenant, job, applicant) so re-analyses replace rather than double count
+        self.contributions = OrderedDict()
+        # Applicant ids per (tenant, job), so evicting a job also drops its contributions
+        self.applicants = {}
+        self._lock = threading.Lock()
+    
+    def _job(self, key):
+        aggregate = self.jobs.get(key)
+        if aggregate is not None:
+            self.jobs.move_to_end(key)
+            return aggregate
+        self.jobs[key] = aggregate = SkillGapAggregate()
+        while len(self.jobs) > app.config['ANALYTICS_MAX_JOBS']:
+            evicted, _ = self.jobs.popitem(last=False)
+            for applicant_id in self.applicants.pop(evicted, ()):
+                del self.contributions[evicted + (applicant_id,)]
+        return aggregate
+    
+    def _remember(self, key, contribution):
+        """Store an applicant's contribution, forgetting the least recent ones past the cap"""
+        self.contributions[key] = contribution
+        self.contributions.move_to_end(key)
+        self.applicants.setdefault(key[:2], set()).add(key[2])
+        while len(self.contributions) > app.config['ANALYTICS_MAX_APPLICANTS']:
+            (tenant_id, job_id, applicant_id), _ = self.contributions.popitem(last=False)
+            self.applicants[(tenant_id, job_id)].discard(applicant_id)
+    
+    def record(self, payload, job_id=None, applicant_id=None, tenant_id=None):
+        """Fold a successful /analyze payload into the aggregates"""
+        tenant_id = tenant_id or ''
+        contribution = (
+            payload["match_score"],
+            frozenset(payload["matched_skills"]),
+            frozenset(payload["missing_skills"]),
+            frozenset(payload["extra_skills"])
+        )
+        with self._lock:
+            targets = [self.pools.setdefault(tenant_id, SkillGapAggregate())]
+            if job_id:
+                targets.append(self._job((tenant_id, job_id)))
+                if applicant_id:
+                    previous = self.contributions.get((tenant_id, job_id, applicant_id))
+                    if previous is not None:
+                        for aggregate in targets:
+                            aggregate.add(previous, sign=-1)
+                    self._remember((tenant_id, job_id, applicant_id), contribution)
+            for aggregate in targets:
+                aggregate.add(contribution)
+    
+    def skill_gaps(self, job_id=None, tenant_id=None, top=10):
+        """Summary for one job, or for the tenant's whole pool when job_id is None"""
+        tenant_id = tenant_id or ''
+        with self._lock:
+            aggregate = self.jobs.get((tenant_id, job_id)) if job_id else self.pools.get(tenant_id)
+            if aggregate is None:
+                return None
+            return aggregate.summary(top)
+    
+    def job_ids(self, tenant_id=None):
+        tenant_id = tenant_id or ''
+        with self._lock:
+            return {job_id: aggregate.analyses for (tenant, job_id), aggregate in self.jobs.items()
+                    if tenant == tenant_id}
+
+ANALYTICS = SkillGapAnalytics()
+
 # HTML template (same as before)
 HTML_TEMPLATE = """
 <!doctype html>
@@ -768,61 +1619,225 @@ HTML_TEMPLATE = """
 def home():
     return render_template_string(HTML_TEMPLATE, year=datetime.now().year)
 
-# Analyze route
-@app.route("/analyze", methods=["POST"])
-def analyze():
-    # Get job description text
-    jd_text = request.form.get("jd_text", "")
-    
-    # Get resume text from file upload
-    resume_text = ""
-    
-    # Check if a file was uploaded
-    if 'resume_file' in request.files:
-        file = request.files['resume_file']
-        if file and file.filename != '':
-            resume_text = extract_text_from_file(file)
-    
+def analysis_error(message):
+    """Build the error payload returned for invalid analysis input"""
+    return {
+        "error": message,
+        "match_score": 0,
+        "matched_skills": [],
+        "missing_skills": [],
+        "extra_skills": [],
+        "job_titles": [],
+        "experience_level": "Not specified",
+        "resume_experience_level": "Not specified",
+        "skill_sections": {},
+        "heatmap_data": []
+    }
+
+def run_analysis(resume_text, jd_text, tenant_id=None, profile=None):
+    """Run the full analysis pipeline and return (payload, status code)"""
     # Validate inputs
     if not resume_text or resume_text.startswith("Error") or resume_text == "Unsupported file format":
-        return jsonify({
-            "error": "Please upload a valid resume file (PDF, DOCX, or TXT)",
-            "match_score": 0,
-            "matched_skills": [],
-            "missing_skills": [],
-            "extra_skills": [],
-            "job_titles": [],
-            "experience_level": "Not specified",
-            "heatmap_data": []
-        }), 400
+        return analysis_error("Please upload a valid resume file (PDF, DOCX, or TXT)"), 400
     
     if not jd_text.strip():
-        return jsonify({
-            "error": "Please enter a job description",
-            "match_score": 0,
-            "matched_skills": [],
-            "missing_skills": [],
-            "extra_skills": [],
-            "job_titles": [],
-            "experience_level": "Not specified",
-            "heatmap_data": []
-        }), 400
+        return analysis_error("Please enter a job description"), 400
+    
+    # Select the tenant's taxonomy
+    try:
+        matcher = get_matcher(tenant_id)
+    except KeyError:
+        return analysis_error(f"Unknown tenant: {tenant_id}"), 400
+    except ValueError as e:
+        app.logger.error("Invalid taxonomy overlay for tenant %s: %s", tenant_id, e)
+        return analysis_error(f"Invalid taxonomy configuration for tenant: {tenant_id}"), 400
     
     # Calculate match
-    match_score, matched_skills, missing_skills, extra_skills, job_titles, experience_level = calculate_match(resume_text, jd_text)
+    with profile_stage(profile, "calculate_match"):
+        (match_score, matched_skills, missing_skills, extra_skills, job_titles,
+         experience_level, skill_sections, resume_experience_level) = calculate_match(resume_text, jd_text, matcher)
     
     # Generate heatmap data
-    heatmap_data = generate_keyword_heatmap(resume_text, jd_text)
+    with profile_stage(profile, "generate_keyword_heatmap"):
+        heatmap_data = generate_keyword_heatmap(resume_text, jd_text)
     
-    return jsonify({
+    return {
         "match_score": match_score,
         "matched_skills": matched_skills,
         "missing_skills": missing_skills,
         "extra_skills": extra_skills,
         "job_titles": job_titles,
         "experience_level": experience_level,
+        "resume_experience_level": resume_experience_level,
+        "skill_sections": skill_sections,
         "heatmap_data": heatmap_data
-    })
+    }, 200
+
+def score_bulk(resume_texts, jd_texts, resume_ids, jd_ids, matcher=None):
+    """Score every resume against every job description into column-oriented BulkScores"""
+    matcher = matcher or BASE_MATCHER
+    # Features are extracted once per document, not once per pair
+    resumes = [DocumentFeatures(text, matcher, EXPERIENCE_SECTIONS) for text in resume_texts]
+    jds = [DocumentFeatures(text, matcher) for text in jd_texts]
+    
+    skills = Vocabulary(matcher.skill_names)
+    titles = Vocabulary(matcher.title_names)
+    levels = Vocabulary(["Not specified"])
+    
+    return BulkScores(
+        skills=skills,
+        titles=titles,
+        levels=levels,
+        resume_ids=resume_ids,
+        jd_ids=jd_ids,
+        resume_skills=[skills.bitset(resume.skills) for resume in resumes],
+        resume_experience=[levels.id_of(resume.experience_level) for resume in resumes],
+        jd_skills=[skills.bitset(jd.skills) for jd in jds],
+        jd_titles=[titles.bitset(jd.titles) for jd in jds],
+        jd_experience=[levels.id_of(jd.experience_level) for jd in jds],
+        scores=[[score_match(resume, jd) for jd in jds] for resume in resumes]
+    )
+
+BULK_FORMATS = ('json', 'compact', 'npz')
+
+def run_bulk_scoring(files, jd_texts, resume_ids=None, jd_ids=None, output_format='json', tenant_id=None):
+    """Run an M x N bulk scoring request and return (body bytes, mimetype, status code)"""
+    def error(message, status=400):
+        return json.dumps({"error": message}).encode('utf-8'), 'application/json', status
+    
+    files = [file for file in files if file and file.filename != '']
+    jd_texts = [text for text in jd_texts if text.strip()]
+    if not files:
+        return error("Please upload at least one resume file (PDF, DOCX, or TXT)")
+    if not jd_texts:
+        return error("Please enter at least one job description")
+    if len(files) * len(jd_texts) > app.config['BULK_MAX_PAIRS']:
+        return error(f"At most {app.config['BULK_MAX_PAIRS']} resume/job pairs per request")
+    if output_format not in BULK_FORMATS:
+        return error(f"Unknown format '{output_format}' (expected one of {', '.join(BULK_FORMATS)})")
+    
+    try:
+        matcher = get_matcher(tenant_id)
+    except KeyError:
+        return error(f"Unknown tenant: {tenant_id}")
+    except ValueError as e:
+        app.logger.error("Invalid taxonomy overlay for tenant %s: %s", tenant_id, e)
+        return error(f"Invalid taxonomy configuration for tenant: {tenant_id}")
+    
+    resume_texts = []
+    for file in files:
+        text = extract_text_from_file(file)
+        if not text or text.startswith("Error") or text == "Unsupported file format":
+            return error(f"Could not read resume '{file.filename}'")
+        resume_texts.append(text)
+    
+    # Ids default to file names and job description positions
+    resume_ids = resume_ids if resume_ids and len(resume_ids) == len(files) else [file.filename for file in files]
+    jd_ids = jd_ids if jd_ids and len(jd_ids) == len(jd_texts) else [str(i) for i in range(len(jd_texts))]
+    results = score_bulk(resume_texts, jd_texts, resume_ids, jd_ids, matcher)
+    
+    if output_format == 'npz':
+        try:
+            return results.to_npz(), 'application/octet-stream', 200
+        except NumpyUnavailable as e:
+            # A server-side gap, not a bad request
+            app.logger.error("Bulk scoring: %s", e)
+            return error(str(e), 501)
+    if output_format == 'compact':
+        return json.dumps(results.to_compact(), separators=(',', ':')).encode('utf-8'), 'application/json', 200
+    return json.dumps({"results": list(results.pairs())}).encode('utf-8'), 'application/json', 200
+
+# Analyze route
+@app.route("/analyze", methods=["POST"])
+def analyze():
+    # Get job description text
+    jd_text = request.form.get("jd_text", "")
+    
+    # Tenant taxonomy is selected by header or form field
+    tenant_id = request.headers.get("X-Tenant-ID") or request.form.get("tenant")
+    
+    message = analytics_id_error(request.form.get("job_id"), request.form.get("applicant_id"))
+    if message:
+        return jsonify(analysis_error(message)), 400
+    
+    with request_profiling(profile_reason(request.headers), path=request.path,
+                           tenant=tenant_id, content_length=request.content_length) as profile:
+        # Get resume text from file upload
+        resume_text = ""
+        
+        # Check if a file was uploaded
+        if 'resume_file' in request.files:
+            file = request.files['resume_file']
+            if file and file.filename != '':
+                with profile_stage(profile, "extract_text_from_file"):
+                    resume_text = extract_text_from_file(file)
+        
+        payload, status = run_analysis(resume_text, jd_text, tenant_id, profile)
+        if profile:
+            profile.meta["status"] = status
+    
+    # Feed the skill-gap analytics
+    if status == 200:
+        ANALYTICS.record(payload, request.form.get("job_id"), request.form.get("applicant_id"), tenant_id)
+    return jsonify(payload), status
+
+# Bulk scoring of every uploaded resume against every job description
+@app.route("/score/bulk", methods=["POST"])
+def bulk_score():
+    tenant_id = request.headers.get("X-Tenant-ID") or request.form.get("tenant")
+    body, mimetype, status = run_bulk_scoring(
+        request.files.getlist("resume_file"),
+        request.form.getlist("jd_text"),
+        request.form.getlist("resume_id"),
+        request.form.getlist("jd_id"),
+        request.form.get("format", "json"),
+        tenant_id
+    )
+    return Response(body, status=status, mimetype=mimetype)
+
+# Skill-gap analytics for one job, or the whole pool when job_id is omitted
+@app.route("/analytics/skill-gaps", methods=["GET"])
+def skill_gaps():
+    tenant_id = request.headers.get("X-Tenant-ID") or request.args.get("tenant")
+    job_id = request.args.get("job_id")
+    summary = ANALYTICS.skill_gaps(job_id, tenant_id, request.args.get("top", 10, type=int))
+    if summary is None:
+        return jsonify({"error": "No analyses recorded for this job"}), 404
+    return jsonify({"job_id": job_id, **summary})
+
+# Jobs with recorded analyses
+@app.route("/analytics/jobs", methods=["GET"])
+def analytics_jobs():
+    tenant_id = request.headers.get("X-Tenant-ID") or request.args.get("tenant")
+    return jsonify({"jobs": ANALYTICS.job_ids(tenant_id)})
+
+# Recent request profiles
+@app.route("/debug/profiles", methods=["GET"])
+def debug_profiles():
+    # Fails closed: without a configured token the profiles are never served
+    if not has_admin_token(request.headers):
+        return jsonify({"error": "Forbidden"}), 403
+    with PROFILES_LOCK:
+        profiles = list(PROFILES)
+    return jsonify({"profiles": profiles[::-1]})
+
+# Tenant matcher cache metrics
+@app.route("/debug/taxonomy-cache", methods=["GET"])
+def taxonomy_cache_stats():
+    return jsonify(MATCHER_CACHE.stats())
+
+def worker_cache_stats():
+    """Cache metrics of this process, reported back by ASGI executor workers"""
+    return {
+        "pid": os.getpid(),
+        "taxonomy": MATCHER_CACHE.stats(),
+        "pdf": PDF_PAGE_CACHE.stats()
+    }
+
+# PDF page text cache metrics
+@app.route("/debug/pdf-cache", methods=["GET"])
+def pdf_cache_stats():
+    return jsonify(PDF_PAGE_CACHE.stats())
 
 if __name__ == "__main__":
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,438 @@
+"""
+ASGI serving path for the Career Intelligence Platform.
+
+Upload receipt and response sending happen on the event loop, so slow
+clients only cost a coroutine instead of a worker thread. The CPU-bound
+pipeline (multipart parsing, extract_text_from_file, calculate_match and
+generate_keyword_heatmap) is dispatched to a bounded executor; when its
+queue is full, /analyze answers 503 with a Retry-After header.
+
+Run with any ASGI server, for example:
+    pip install uvicorn
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Settings (environment variables):
+    ANALYZE_EXECUTOR     "process" (default) or "thread"
+    ANALYZE_WORKERS      executor workers (default: CPU count)
+    ANALYZE_QUEUE_SIZE   jobs allowed to wait behind busy workers (default: 2 x workers)
+    ANALYZE_RETRY_AFTER  seconds advertised in Retry-After on 503 (default: 1)
+"""
+
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from werkzeug.datastructures import FileStorage
+from werkzeug.formparser import FormDataParser
+from werkzeug.http import parse_options_header
+
+import app as flask_app
+
+MAX_CONTENT_LENGTH = flask_app.app.config['MAX_CONTENT_LENGTH']
+RESPONSE_CHUNK_SIZE = 64 * 1024
+
+
+def analyze_request(body, content_type, tenant_id=None, profile_reason=None, tenant_overlays=None):
+    """Parse a multipart /analyze body and run the analysis (executes in a worker)
+
+    Returns (payload, status, extras); extras carries the profile (None unless requested)
+    and the analytics keys from the form, both handled by the serving process.
+    tenant_overlays are the taxonomies registered in the serving process.
+    """
+    if tenant_overlays is not None:
+        flask_app.sync_tenant_overlays(tenant_overlays)
+    mimetype, options = parse_options_header(content_type)
+    _, form, files = FormDataParser().parse(io.BytesIO(body), mimetype, len(body), options)
+
+    jd_text = form.get("jd_text", "")
+    tenant_id = tenant_id or form.get("tenant")
+    extras = {"profile": None, "tenant_id": tenant_id,
+              "job_id": form.get("job_id"), "applicant_id": form.get("applicant_id")}
+    message = flask_app.analytics_id_error(extras["job_id"], extras["applicant_id"])
+    if message:
+        return flask_app.analysis_error(message), 400, {**extras, "caches": flask_app.worker_cache_stats()}
+
+    # The profile is returned to the serving process, which owns the /debug/profiles buffer
+    with flask_app.request_profiling(profile_reason, record=False, path='/analyze',
+                                     tenant=tenant_id, content_length=len(body)) as profile:
+        resume_text = ""
+        file = files.get('resume_file')
+        if file and file.filename != '':
+            # Re-wrap so the extractor sees a fresh seekable stream
+            with flask_app.profile_stage(profile, "extract_text_from_file"):
+                resume_text = flask_app.extract_text_from_file(
+                    FileStorage(stream=io.BytesIO(file.read()), filename=file.filename)
+                )
+
+        # Each worker process keeps its own LRU cache of tenant matchers
+        payload, status = flask_app.run_analysis(resume_text, jd_text, tenant_id, profile)
+        if profile:
+            profile.meta["status"] = status
+
+    extras["profile"] = profile.result if profile else None
+    return payload, status, {**extras, "caches": flask_app.worker_cache_stats()}
+
+
+def bulk_request(body, content_type, tenant_id=None, tenant_overlays=None):
+    """Parse a multipart /score/bulk body and score every pair (executes in a worker)
+
+    Returns (body, mimetype, status, cache stats of the worker).
+    """
+    if tenant_overlays is not None:
+        flask_app.sync_tenant_overlays(tenant_overlays)
+    mimetype, options = parse_options_header(content_type)
+    _, form, files = FormDataParser().parse(io.BytesIO(body), mimetype, len(body), options)
+    result, mimetype, status = flask_app.run_bulk_scoring(
+        files.getlist("resume_file"),
+        form.getlist("jd_text"),
+        form.getlist("resume_id"),
+        form.getlist("jd_id"),
+        form.get("format", "json"),
+        tenant_id or form.get("tenant")
+    )
+    return result, mimetype, status, flask_app.worker_cache_stats()
+
+
+def init_process_worker():
+    """Executor workers extract PDF pages serially instead of each starting its own pool"""
+    flask_app.app.config['PDF_EXTRACT_WORKERS'] = 1
+
+
+class WorkerLost(Exception):
+    """A process worker died while running the job, e.g. killed for using too much memory"""
+
+
+class BoundedExecutor:
+    """Executor wrapper that rejects work once workers and queue are full"""
+
+    def __init__(self, kind='process', workers=None, queue_size=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = self.workers + (queue_size if queue_size is not None else 2 * self.workers)
+        self.kind = kind
+        self.outstanding = 0
+        self.executor = None
+
+    def start(self):
+        if self.kind == 'thread':
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        else:
+            # spawn avoids forking a process that already runs an event loop
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_process_worker
+            )
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def is_full(self):
+        return self.outstanding >= self.capacity
+
+    async def submit(self, fn, *args):
+        """Run fn in the executor
+
+        Raises QueueFull if no slot is available, and WorkerLost if a worker died;
+        a broken process pool is replaced so later jobs run normally.
+        """
+        if self.executor is None:
+            self.start()
+        if self.is_full():
+            raise asyncio.QueueFull()
+        # Only the event loop thread touches the counter, so no lock is needed
+        self.outstanding += 1
+        executor = self.executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # Every job on the broken pool fails at once; only the first one replaces it
+            if self.executor is executor:
+                flask_app.app.logger.error("Analysis worker died; restarting the process pool")
+                self.shutdown()
+                self.start()
+            raise WorkerLost() from None
+        finally:
+            self.outstanding -= 1
+
+
+executor = BoundedExecutor(
+    kind=os.environ.get('ANALYZE_EXECUTOR', 'process'),
+    workers=int(os.environ['ANALYZE_WORKERS']) if os.environ.get('ANALYZE_WORKERS') else None,
+    queue_size=int(os.environ['ANALYZE_QUEUE_SIZE']) if os.environ.get('ANALYZE_QUEUE_SIZE') else None
+)
+RETRY_AFTER = os.environ.get('ANALYZE_RETRY_AFTER', '1')
+
+# Latest cache metrics reported by each executor worker, keyed by pid. With
+# process workers every worker has its own caches, so the serving process
+# only sees them through these reports (as of each worker's last job).
+WORKER_CACHE_STATS = {}
+
+
+def aggregate_cache_stats(name):
+    """Sum one cache's metrics over all executor workers"""
+    per_worker = {pid: caches[name] for pid, caches in WORKER_CACHE_STATS.items()}
+    totals = {key: sum(stats[key] for stats in per_worker.values())
+              for key in ('entries', 'bytes', 'hits', 'misses', 'evictions')}
+    lookups = totals['hits'] + totals['misses']
+    return {
+        **totals,
+        "hit_rate": totals['hits'] / lookups if lookups else 0.0,
+        "workers": len(per_worker),
+        "per_worker": per_worker
+    }
+
+
+async def send_response(send, status, body, content_type, headers=()):
+    """Send a complete response, streaming the body in chunks"""
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type.encode()),
+            (b'content-length', str(len(body)).encode()),
+            *headers
+        ]
+    })
+    for offset in range(0, len(body), RESPONSE_CHUNK_SIZE):
+        chunk = body[offset:offset + RESPONSE_CHUNK_SIZE]
+        await send({
+            'type': 'http.response.body',
+            'body': chunk,
+            'more_body': offset + RESPONSE_CHUNK_SIZE < len(body)
+        })
+    if not body:
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+async def send_json(send, status, payload, headers=()):
+    await send_response(send, status, json.dumps(payload).encode('utf-8'), 'application/json', headers)
+
+
+async def send_overloaded(send):
+    await send_json(
+        send, 503, flask_app.analysis_error("Server is busy, please retry shortly"),
+        headers=[(b'retry-after', RETRY_AFTER.encode())]
+    )
+
+
+def registered_overlays():
+    """Snapshot of the tenant taxonomies registered here, for process workers (threads share them)"""
+    return dict(flask_app.TENANT_OVERLAYS) if executor.kind == 'process' else None
+
+
+def header_view(headers):
+    """Expose the ASGI headers the profiling helpers look up by name"""
+    return {'X-Profile-Token': headers.get(b'x-profile-token', b'').decode('latin-1')}
+
+
+def declared_length(headers):
+    """Content-Length as an int, None if absent; raises ValueError if malformed"""
+    value = headers.get(b'content-length')
+    if value is None:
+        return None
+    length = int(value)
+    if length < 0:
+        raise ValueError("negative Content-Length")
+    return length
+
+
+async def receive_body(receive, limit):
+    """Read the request body on the event loop; returns None if it exceeds limit"""
+    chunks = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionResetError("client disconnected")
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        more_body = message.get('more_body', False)
+    return b''.join(chunks)
+
+
+# Home route
+async def home(scope, receive, send):
+    page = flask_app.app.jinja_env.from_string(flask_app.HTML_TEMPLATE).render(year=datetime.now().year)
+    await send_response(send, 200, page.encode('utf-8'), 'text/html; charset=utf-8')
+
+
+# Analyze route
+async def analyze(scope, receive, send):
+    headers = dict(scope['headers'])
+    content_type = headers.get(b'content-type', b'').decode('latin-1')
+    tenant_id = headers.get(b'x-tenant-id', b'').decode('latin-1') or None
+    profile_reason = flask_app.profile_reason(header_view(headers))
+
+    # Reject early when already saturated so the client does not upload for nothing
+    if executor.is_full():
+        await send_overloaded(send)
+        return
+
+    try:
+        content_length = declared_length(headers)
+    except ValueError:
+        await send_json(send, 400, flask_app.analysis_error("Invalid Content-Length header"))
+        return
+    if content_length is not None and content_length > MAX_CONTENT_LENGTH:
+        await send_json(send, 413, flask_app.analysis_error("Uploaded file is too large"))
+        return
+
+    body = await receive_body(receive, MAX_CONTENT_LENGTH)
+    if body is None:
+        await send_json(send, 413, flask_app.analysis_error("Uploaded file is too large"))
+        return
+
+    try:
+        payload, status, extras = await executor.submit(
+            analyze_request, body, content_type, tenant_id, profile_reason, registered_overlays()
+        )
+    except (asyncio.QueueFull, WorkerLost):
+        await send_overloaded(send)
+        return
+    WORKER_CACHE_STATS[extras["caches"]["pid"]] = extras["caches"]
+    if extras["profile"]:
+        flask_app.record_profile(extras["profile"])
+    if status == 200:
+        flask_app.ANALYTICS.record(payload, extras["job_id"], extras["applicant_id"], extras["tenant_id"])
+    await send_json(send, status, payload)
+
+
+# Bulk scoring of every uploaded resume against every job description
+async def bulk_score(scope, receive, send):
+    headers = dict(scope['headers'])
+    content_type = headers.get(b'content-type', b'').decode('latin-1')
+    tenant_id = headers.get(b'x-tenant-id', b'').decode('latin-1') or None
+
+    if executor.is_full():
+        await send_overloaded(send)
+        return
+
+    try:
+        content_length = declared_length(headers)
+    except ValueError:
+        await send_json(send, 400, {"error": "Invalid Content-Length header"})
+        return
+    if content_length is not None and content_length > MAX_CONTENT_LENGTH:
+        await send_json(send, 413, {"error": "Upload is too large"})
+        return
+
+    body = await receive_body(receive, MAX_CONTENT_LENGTH)
+    if body is None:
+        await send_json(send, 413, {"error": "Upload is too large"})
+        return
+
+    try:
+        result, mimetype, status, caches = await executor.submit(
+            bulk_request, body, content_type, tenant_id, registered_overlays()
+        )
+    except (asyncio.QueueFull, WorkerLost):
+        await send_overloaded(send)
+        return
+    WORKER_CACHE_STATS[caches["pid"]] = caches
+    await send_response(send, status, result, mimetype)
+
+
+# Tenant matcher cache metrics, summed over executor workers
+async def taxonomy_cache_stats(scope, receive, send):
+    await send_json(send, 200, aggregate_cache_stats("taxonomy"))
+
+
+# PDF page text cache metrics, summed over executor workers
+async def pdf_cache_stats(scope, receive, send):
+    await send_json(send, 200, aggregate_cache_stats("pdf"))
+
+
+def query_params(scope):
+    return {key: values[0] for key, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+
+
+# Skill-gap analytics for one job, or the whole pool when job_id is omitted
+async def skill_gaps(scope, receive, send):
+    params = query_params(scope)
+    tenant_id = dict(scope['headers']).get(b'x-tenant-id', b'').decode('latin-1') or params.get("tenant")
+    job_id = params.get("job_id")
+    try:
+        top = int(params.get("top", 10))
+    except ValueError:
+        top = 10
+    summary = flask_app.ANALYTICS.skill_gaps(job_id, tenant_id, top)
+    if summary is None:
+        await send_json(send, 404, {"error": "No analyses recorded for this job"})
+        return
+    await send_json(send, 200, {"job_id": job_id, **summary})
+
+
+# Jobs with recorded analyses
+async def analytics_jobs(scope, receive, send):
+    tenant_id = dict(scope['headers']).get(b'x-tenant-id', b'').decode('latin-1') or query_params(scope).get("tenant")
+    await send_json(send, 200, {"jobs": flask_app.ANALYTICS.job_ids(tenant_id)})
+
+
+# Recent request profiles
+async def debug_profiles(scope, receive, send):
+    # Fails closed: without a configured token the profiles are never served
+    if not flask_app.has_admin_token(header_view(dict(scope['headers']))):
+        await send_json(send, 403, {"error": "Forbidden"})
+        return
+    with flask_app.PROFILES_LOCK:
+        profiles = list(flask_app.PROFILES)
+    await send_json(send, 200, {"profiles": profiles[::-1]})
+
+
+ROUTES = {
+    ('GET', '/'): home,
+    ('POST', '/analyze'): analyze,
+    ('POST', '/score/bulk'): bulk_score,
+    ('GET', '/debug/profiles'): debug_profiles,
+    ('GET', '/debug/taxonomy-cache'): taxonomy_cache_stats,
+    ('GET', '/debug/pdf-cache'): pdf_cache_stats,
+    ('GET', '/analytics/skill-gaps'): skill_gaps,
+    ('GET', '/analytics/jobs'): analytics_jobs
+}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            executor.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        allowed = [method for method, path in ROUTES if path == scope['path']]
+        if allowed:
+            await send_json(send, 405, {"error": "Method not allowed"}, headers=[(b'allow', ', '.join(allowed).encode())])
+        else:
+            await send_json(send, 404, {"error": "Not found"})
+        return
+
+    try:
+        await handler(scope, receive, send)
+    except ConnectionResetError:
+        # Client went away mid-upload; nothing to answer
+        pass
@@ -0,0 +1,589 @@
+"""
+Load generator for the Career Intelligence Platform.
+
+Drives a locally running server with a configurable mix of PDF/DOCX/TXT
+resume uploads and job descriptions of different sizes, then reports
+throughput, latency percentiles, error rates and server RSS over time.
+
+Everything runs on the local box: fixtures are generated in-process and no
+external services are contacted.
+
+Examples:
+    python app.py &
+    python loadtest.py --concurrency 8 --duration 30
+    python loadtest.py --rate 20 --duration 60 --mix pdf=2,docx=1,txt=1 --jd-mix small=1,large=1
+    python loadtest.py --concurrency 16 --pdf-pages 40 --json report.json
+"""
+
+import argparse
+import http.client
+import io
+import json
+import os
+import random
+import threading
+import time
+import uuid
+import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+# Vocabulary used to build synthetic resumes and job descriptions
+SKILL_WORDS = [
+    'python', 'django', 'flask', 'java', 'spring boot', 'javascript', 'react',
+    'angular', 'typescript', 'node.js', 'sql', 'postgresql', 'mongodb', 'redis',
+    'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'terraform', 'git', 'linux',
+    'agile', 'scrum', 'ci/cd', 'microservices', 'rest', 'graphql', 'tensorflow',
+    'pytorch', 'communication', 'leadership', 'teamwork', 'problem solving'
+]
+
+TITLE_WORDS = [
+    'software engineer', 'data scientist', 'devops engineer', 'frontend developer',
+    'backend developer', 'fullstack developer', 'cloud engineer', 'qa engineer'
+]
+
+FILLER_WORDS = [
+    'designed', 'implemented', 'delivered', 'scalable', 'platform', 'services',
+    'customers', 'improved', 'performance', 'reliability', 'team', 'product',
+    'pipelines', 'architecture', 'migrated', 'reduced', 'latency', 'owned',
+    'mentored', 'engineers', 'features', 'production', 'monitoring', 'testing'
+]
+
+# Approximate number of sentences per job description size
+JD_SIZES = {
+    'small': 5,
+    'medium': 25,
+    'large': 120
+}
+
+
+def parse_mix(spec, allowed):
+    """Parse a weighted mix such as 'pdf=2,txt=1' into a list of (name, weight)"""
+    mix = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition('=')
+        name = name.strip().lower()
+        if name not in allowed:
+            raise argparse.ArgumentTypeError(f"unknown mix entry '{name}' (expected one of {', '.join(allowed)})")
+        mix.append((name, float(weight) if weight else 1.0))
+    if not mix:
+        raise argparse.ArgumentTypeError("mix must contain at least one entry")
+    return mix
+
+
+def random_sentence(rng, n_skills=2):
+    """Build one sentence mixing filler words with a few skills"""
+    words = rng.sample(FILLER_WORDS, 6) + rng.sample(SKILL_WORDS, n_skills)
+    rng.shuffle(words)
+    return ' '.join(words).capitalize() + '.'
+
+
+def generate_resume_text(rng, sentences=30):
+    """Generate a synthetic resume as plain text"""
+    lines = [
+        rng.choice(TITLE_WORDS).title(),
+        f"{rng.randint(1, 15)} years experience",
+        '',
+        'Experience'
+    ]
+    lines.extend(random_sentence(rng) for _ in range(sentences))
+    lines.extend(['', 'Skills', ', '.join(rng.sample(SKILL_WORDS, 12))])
+    return '\n'.join(lines)
+
+
+def generate_jd_text(rng, size):
+    """Generate a synthetic job description of the given size class"""
+    title = rng.choice(TITLE_WORDS)
+    lines = [
+        f"We are hiring a senior {title}.",
+        f"Requires {rng.randint(2, 10)}+ years experience."
+    ]
+    lines.extend(random_sentence(rng, 3) for _ in range(JD_SIZES[size]))
+    return '\n'.join(lines)
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_pdf(text, pages=1, lines_per_page=45, page_header=None):
+    """Build a minimal multi-page PDF with Helvetica text (no external deps)
+
+    page_header, if given, is drawn as the first line of every page.
+    """
+    lines = text.splitlines() or ['']
+    # Repeat content until every page is filled
+    body_lines = lines_per_page - (page_header is not None)
+    needed = pages * body_lines
+    lines = (lines * (needed // len(lines) + 1))[:needed]
+    if page_header is not None:
+        lines = [line for p in range(pages) for line in [page_header] + lines[p * body_lines:(p + 1) * body_lines]]
+
+    objects = []
+    page_ids = []
+    font_id = 3
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(None)  # Pages tree, filled in once page ids are known
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for p in range(pages):
+        chunk = lines[p * lines_per_page:(p + 1) * lines_per_page]
+        stream = "BT /F1 10 Tf 14 TL 50 800 Td\n"
+        stream += ''.join(f"({_pdf_escape(line)}) Tj T*\n" for line in chunk)
+        stream += "ET"
+        stream = stream.encode('latin-1', 'replace')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (font_id, content_id)
+        )
+        page_ids.append(len(objects))
+
+    kids = b' '.join(b"%d 0 R" % pid for pid in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % i + body + b"\nendobj\n")
+    xref_pos = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_pos))
+    return out.getvalue()
+
+
+def build_docx(text):
+    """Build a DOCX document using python-docx (already an app dependency)"""
+    import docx
+    document = docx.Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+# Fixed-length placeholder replaced by a per-request salt when --unique-documents is set;
+# keeping the length lets PDF payloads be salted in place without rewriting the xref table
+SALT_PLACEHOLDER = "ref 0000000000000000"
+
+
+def salt_payload(kind, payload, salt):
+    """Replace the salt placeholder in a resume payload with salt (16 hex digits)"""
+    old, new = SALT_PLACEHOLDER.encode(), f"ref {salt}".encode()
+    if kind != 'docx':
+        return payload.replace(old, new)
+    # DOCX entries carry CRCs, so the archive is rewritten with the salted document part
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(payload)) as source, zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            data = source.read(item)
+            target.writestr(item, data.replace(old, new) if item.filename == 'word/document.xml' else data)
+    return out.getvalue()
+
+
+def build_fixtures(kinds, jd_sizes, variants, pdf_pages, seed, unique=False):
+    """Pre-generate resume files and job descriptions so generation cost stays out of the measurement
+
+    With unique=True every resume carries SALT_PLACEHOLDER (on every PDF page) for salt_payload.
+    """
+    rng = random.Random(seed)
+    resumes = {kind: [] for kind in kinds}
+    for kind in kinds:
+        for i in range(variants):
+            text = generate_resume_text(rng)
+            if unique and kind != 'pdf':
+                text = SALT_PLACEHOLDER + "\n" + text
+            if kind == 'pdf':
+                payload = build_pdf(text, pages=pdf_pages, page_header=SALT_PLACEHOLDER if unique else None)
+            elif kind == 'docx':
+                payload = build_docx(text)
+            else:
+                payload = text.encode('utf-8')
+            resumes[kind].append((f"resume_{i}.{kind}", payload))
+    jds = {size: [generate_jd_text(rng, size) for _ in range(variants)] for size in jd_sizes}
+    return resumes, jds
+
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'txt': 'text/plain'
+}
+
+
+def encode_multipart(fields, files):
+    """Encode form fields and files as multipart/form-data"""
+    boundary = uuid.uuid4().hex
+    out = io.BytesIO()
+    for name, value in fields.items():
+        out.write(f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n".encode())
+        out.write(value.encode('utf-8'))
+        out.write(b"\r\n")
+    for name, (filename, payload, content_type) in files.items():
+        out.write(
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n".encode()
+        )
+        out.write(payload)
+        out.write(b"\r\n")
+    out.write(f"--{boundary}--\r\n".encode())
+    return out.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+
+def find_server_pid(port):
+    """Find the pid listening on a local TCP port by scanning /proc (Linux only)"""
+    inodes = set()
+    for table in ('/proc/net/tcp', '/proc/net/tcp6'):
+        try:
+            with open(table) as fh:
+                next(fh)
+                for line in fh:
+                    cols = line.split()
+                    local_port = int(cols[1].rsplit(':', 1)[1], 16)
+                    if local_port == port and cols[3] == '0A':  # 0A == LISTEN
+                        inodes.add(cols[9])
+        except (OSError, StopIteration):
+            continue
+    if not inodes:
+        return None
+
+    candidates = []
+    for pid in filter(str.isdigit, os.listdir('/proc')):
+        fd_dir = f"/proc/{pid}/fd"
+        try:
+            for fd in os.listdir(fd_dir):
+                target = os.readlink(os.path.join(fd_dir, fd))
+                if target.startswith('socket:[') and target[8:-1] in inodes:
+                    candidates.append(int(pid))
+                    break
+        except OSError:
+            continue
+    if not candidates:
+        return None
+    # With the Flask reloader both parent and child hold the socket; report the root of the tree
+    for pid in sorted(candidates):
+        if read_ppid(pid) not in candidates:
+            return pid
+    return min(candidates)
+
+
+def read_ppid(pid):
+    """Parent pid from /proc/<pid>/stat, or None if the process is gone"""
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            # The command name may contain spaces, so split after its closing parenthesis
+            return int(fh.read().rsplit(')', 1)[1].split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def process_tree(root):
+    """The root pid and all of its descendants (worker pools, reloader children, ...)"""
+    children = {}
+    for pid in filter(str.isdigit, os.listdir('/proc')):
+        ppid = read_ppid(int(pid))
+        if ppid is not None:
+            children.setdefault(ppid, []).append(int(pid))
+    tree, stack = [], [root]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(children.get(pid, []))
+    return tree
+
+
+def read_tree_rss_kb(root):
+    """Summed resident set size of a process and its descendants in KiB"""
+    sizes = [read_rss_kb(pid) for pid in process_tree(root)]
+    sizes = [size for size in sizes if size is not None]
+    return (sum(sizes), len(sizes)) if sizes else (None, 0)
+
+
+def read_rss_kb(pid):
+    """Read resident set size of a process in KiB"""
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class LoadTest:
+    """Runs requests against the server and collects per-request results"""
+
+    def __init__(self, args, resumes, jds):
+        self.args = args
+        self.resumes = resumes
+        self.jds = jds
+        url = urlsplit(args.url)
+        self.host = url.hostname or '127.0.0.1'
+        self.port = url.port or 80
+        self.rng = random.Random(args.seed)
+        self.rng_lock = threading.Lock()
+        self.results = []
+        self.results_lock = threading.Lock()
+        self.rss_samples = []
+        self.stop = threading.Event()
+        self.documents_sent = 0
+
+    def pick_request(self):
+        with self.rng_lock:
+            kind = self.rng.choices([k for k, _ in self.args.mix], [w for _, w in self.args.mix])[0]
+            size = self.rng.choices([s for s, _ in self.args.jd_mix], [w for _, w in self.args.jd_mix])[0]
+            endpoint = self.rng.choice(self.args.endpoint)
+            filename, payload = self.rng.choice(self.resumes[kind])
+            jd_text = self.rng.choice(self.jds[size])
+            self.documents_sent += 1
+            serial = self.documents_sent
+        if self.args.unique_documents:
+            # A new document per request, so server-side text and page caches never hit
+            payload = salt_payload(kind, payload, f"{self.args.seed:08x}{serial:08x}")
+        return endpoint, kind, size, filename, payload, jd_text
+
+    def send_one(self, scheduled_at=None):
+        endpoint, kind, size, filename, payload, jd_text = self.pick_request()
+        body, content_type = encode_multipart(
+            {'jd_text': jd_text},
+            {'resume_file': (filename, payload, CONTENT_TYPES[kind])}
+        )
+        # Open-loop latency is measured from the scheduled send time to avoid coordinated omission
+        start = scheduled_at if scheduled_at is not None else time.perf_counter()
+        status = None
+        error = None
+        try:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.args.timeout)
+            try:
+                conn.request('POST', endpoint, body=body, headers={
+                    'Content-Type': content_type,
+                    'Content-Length': str(len(body))
+                })
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            finally:
+                conn.close()
+        except Exception as e:
+            error = type(e).__name__
+        end = time.perf_counter()
+
+        with self.results_lock:
+            self.results.append({
+                'start': start,
+                'end': end,
+                'latency': end - start,
+                'status': status,
+                'error': error,
+                'kind': kind,
+                'jd_size': size,
+                'endpoint': endpoint,
+                'bytes': len(body)
+            })
+
+    def sample_rss(self, pid, t0):
+        while not self.stop.is_set():
+            rss, processes = read_tree_rss_kb(pid)
+            if rss is not None:
+                self.rss_samples.append((time.perf_counter() - t0, rss, processes))
+            self.stop.wait(self.args.rss_interval)
+
+    def run_closed_loop(self, deadline):
+        def worker():
+            while time.perf_counter() < deadline:
+                self.send_one()
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(self.args.concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def run_open_loop(self, deadline):
+        interval = 1.0 / self.args.rate
+        # Bounds outstanding requests; when full, sending waits, but latency is
+        # still measured from the scheduled time so the backlog shows up
+        in_flight = threading.BoundedSemaphore(self.args.max_in_flight)
+
+        def send_and_release(scheduled_at):
+            try:
+                self.send_one(scheduled_at)
+            finally:
+                in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=self.args.max_in_flight) as pool:
+            next_send = time.perf_counter()
+            while next_send < deadline:
+                now = time.perf_counter()
+                if next_send > now:
+                    time.sleep(next_send - now)
+                in_flight.acquire()
+                pool.submit(send_and_release, next_send)
+                next_send += interval
+
+    def run(self):
+        pid = self.args.pid or find_server_pid(self.port)
+        t0 = time.perf_counter()
+        sampler = None
+        if pid:
+            sampler = threading.Thread(target=self.sample_rss, args=(pid, t0), daemon=True)
+            sampler.start()
+
+        # Warm-up requests are sent but not recorded
+        for _ in range(self.args.warmup):
+            self.send_one()
+        with self.results_lock:
+            self.results.clear()
+
+        t_start = time.perf_counter()
+        deadline = t_start + self.args.duration
+        if self.args.rate:
+            self.run_open_loop(deadline)
+        else:
+            self.run_closed_loop(deadline)
+        elapsed = time.perf_counter() - t_start
+
+        self.stop.set()
+        if sampler:
+            sampler.join()
+        return build_report(self.args, self.results, elapsed, pid, self.rss_samples)
+
+
+def summarize(results, elapsed):
+    latencies = sorted(r['latency'] * 1000 for r in results)
+    ok = sum(1 for r in results if r['status'] and r['status'] < 400)
+    return {
+        'requests': len(results),
+        'ok': ok,
+        'error_rate': (len(results) - ok) / len(results) if results else 0.0,
+        'throughput_rps': len(results) / elapsed if elapsed else 0.0,
+        'latency_ms': {
+            'mean': sum(latencies) / len(latencies) if latencies else 0.0,
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p99': percentile(latencies, 99),
+            'max': latencies[-1] if latencies else 0.0
+        }
+    }
+
+
+def build_report(args, results, elapsed, pid, rss_samples):
+    """Aggregate raw results into the final report"""
+    report = {
+        'url': args.url,
+        'mode': f"rate={args.rate}/s" if args.rate else f"concurrency={args.concurrency}",
+        'duration_s': elapsed,
+        'overall': summarize(results, elapsed),
+        'statuses': dict(Counter(str(r['status'] or r['error']) for r in results)),
+        'by_file_type': {},
+        'by_jd_size': {},
+        'server_pid': pid,
+        'rss_kb': [{'t': round(t, 2), 'rss_kb': rss, 'processes': processes} for t, rss, processes in rss_samples]
+    }
+    for key, field in (('by_file_type', 'kind'), ('by_jd_size', 'jd_size')):
+        groups = {}
+        for r in results:
+            groups.setdefault(r[field], []).append(r)
+        report[key] = {name: summarize(group, elapsed) for name, group in sorted(groups.items())}
+
+    # Per-second throughput/latency timeline
+    timeline = {}
+    t_first = min((r['start'] for r in results), default=0)
+    for r in results:
+        timeline.setdefault(int(r['end'] - t_first), []).append(r)
+    report['timeline'] = [
+        {'second': sec, 'completed': len(group),
+         'p50_ms': percentile(sorted(g['latency'] * 1000 for g in group), 50),
+         'p99_ms': percentile(sorted(g['latency'] * 1000 for g in group), 99)}
+        for sec, group in sorted(timeline.items())
+    ]
+    return report
+
+
+def print_report(report):
+    overall = report['overall']
+    lat = overall['latency_ms']
+    print(f"\nTarget: {report['url']}  mode: {report['mode']}  duration: {report['duration_s']:.1f}s")
+    print(f"Requests: {overall['requests']}  ok: {overall['ok']}  "
+          f"error rate: {overall['error_rate'] * 100:.2f}%  throughput: {overall['throughput_rps']:.2f} req/s")
+    print(f"Latency ms  mean {lat['mean']:.1f}  p50 {lat['p50']:.1f}  p90 {lat['p90']:.1f}  "
+          f"p99 {lat['p99']:.1f}  max {lat['max']:.1f}")
+    print(f"Statuses: {report['statuses']}")
+
+    for title, key in (('File type', 'by_file_type'), ('JD size', 'by_jd_size')):
+        print(f"\n{title:<10} {'reqs':>6} {'err%':>7} {'p50':>8} {'p90':>8} {'p99':>8}")
+        for name, s in report[key].items():
+            print(f"{name:<10} {s['requests']:>6} {s['error_rate'] * 100:>6.2f}% "
+                  f"{s['latency_ms']['p50']:>8.1f} {s['latency_ms']['p90']:>8.1f} {s['latency_ms']['p99']:>8.1f}")
+
+    if report['rss_kb']:
+        samples = report['rss_kb']
+        step = max(1, len(samples) // 10)
+        print(f"\nServer RSS (pid {report['server_pid']} and its child processes):")
+        for s in samples[::step]:
+            print(f"  t={s['t']:>6.1f}s  {s['rss_kb'] / 1024:.1f} MiB  ({s['processes']} processes)")
+        print(f"  peak {max(s['rss_kb'] for s in samples) / 1024:.1f} MiB")
+    else:
+        print("\nServer RSS: not sampled (pass --pid if the server is not discoverable from its port)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Career Intelligence Platform")
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help="base URL of the running server")
+    parser.add_argument('--endpoint', action='append', help="endpoint(s) to POST to (default: /analyze)")
+    parser.add_argument('--concurrency', type=int, default=4, help="closed-loop concurrent clients")
+    parser.add_argument('--rate', type=float, default=0, help="open-loop target requests/second (overrides --concurrency)")
+    parser.add_argument('--max-in-flight', type=int, default=256, help="open-loop cap on outstanding requests; sends wait while it is reached")
+    parser.add_argument('--duration', type=float, default=30, help="test duration in seconds")
+    parser.add_argument('--warmup', type=int, default=3, help="unrecorded warm-up requests")
+    parser.add_argument('--mix', default='pdf=1,docx=1,txt=1',
+                        type=lambda s: parse_mix(s, list(CONTENT_TYPES)), help="weighted resume file type mix")
+    parser.add_argument('--jd-mix', default='small=1,medium=2,large=1',
+                        type=lambda s: parse_mix(s, list(JD_SIZES)), help="weighted job description size mix")
+    parser.add_argument('--pdf-pages', type=int, default=2, help="pages per generated PDF resume")
+    parser.add_argument('--variants', type=int, default=8, help="distinct fixtures per file type / JD size")
+    parser.add_argument('--unique-documents', action='store_true',
+                        help="make every resume unique with a salt line, to measure uncached extraction and parsing")
+    parser.add_argument('--timeout', type=float, default=60, help="per-request timeout in seconds")
+    parser.add_argument('--pid', type=int, help="server pid for RSS sampling, summed over its child processes (auto-detected from the port on Linux)")
+    parser.add_argument('--rss-interval', type=float, default=1.0, help="seconds between RSS samples")
+    parser.add_argument('--seed', type=int, default=1234, help="random seed for fixtures and request mix")
+    parser.add_argument('--json', metavar='PATH', help="also write the full report as JSON")
+    args = parser.parse_args(argv)
+    args.endpoint = args.endpoint or ['/analyze']
+
+    resumes, jds = build_fixtures(
+        [k for k, _ in args.mix], [s for s, _ in args.jd_mix], args.variants, args.pdf_pages, args.seed,
+        args.unique_documents
+    )
+    report = LoadTest(args, resumes, jds).run()
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(report, fh, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
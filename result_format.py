@@ -0,0 +1,276 @@
+"""
+Compact result formats for bulk (M x N) scoring runs.
+
+Instead of one JSON object per pair with repeated skill name lists, a bulk
+run is stored column-wise:
+
+- a shared vocabulary table; skills, job titles and experience levels are
+  referenced by integer id
+- one skill bitset per resume and per job description; the matched, missing
+  and extra skills of any pair follow from bit operations
+  (R & J, J & ~R, R & ~J), so they are never stored per pair
+- an M x N uint8 score matrix
+
+Two encodings are provided: "compact" JSON (id lists, standard library only)
+and NumPy ".npz" (bitsets as uint64 words, requires numpy). This module does
+not depend on Flask, so downstream jobs can import it on its own:
+
+    from result_format import load_bulk_scores
+    run = load_bulk_scores('scores.npz')
+    for pair in run.pairs():
+        ...
+"""
+
+import io
+import json
+
+FORMAT_NAME = 'career-intelligence-bulk-scores'
+FORMAT_VERSION = 1
+
+
+class Vocabulary:
+    """Stable name <-> id table; ids are positions in the name tuple"""
+
+    def __init__(self, names):
+        self.names = tuple(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def id_of(self, name):
+        """Return the id of a name, appending it if it is new"""
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names += (name,)
+        return self.ids[name]
+
+    def bitset(self, names):
+        bits = 0
+        for name in names:
+            bits |= 1 << self.ids[name]
+        return bits
+
+    def decode(self, bits):
+        """Names for the set bits of an int bitset, in id order"""
+        names = []
+        i = 0
+        while bits:
+            if bits & 1:
+                names.append(self.names[i])
+            bits >>= 1
+            i += 1
+        return names
+
+    @property
+    def words(self):
+        """Number of uint64 words per bitset"""
+        return (len(self.names) + 63) // 64
+
+
+class NumpyUnavailable(RuntimeError):
+    """numpy is not installed, so the npz format cannot be used"""
+
+
+def _require_numpy():
+    """Import numpy on first use; only the npz format and skill_matrix need it"""
+    try:
+        import numpy
+    except ImportError:
+        raise NumpyUnavailable("numpy is required for the npz format (pip install numpy)") from None
+    return numpy
+
+
+def _bitset_id_list(bits):
+    ids = []
+    i = 0
+    while bits:
+        if bits & 1:
+            ids.append(i)
+        bits >>= 1
+        i += 1
+    return ids
+
+
+class BulkScores:
+    """Column-oriented results of scoring every resume against every job description
+
+    Bitset columns hold Python ints; after loading from .npz they are uint64
+    arrays and are converted row by row on access.
+    """
+
+    def __init__(self, skills, titles, levels, resume_ids, jd_ids, resume_skills,
+                 resume_experience, jd_skills, jd_titles, jd_experience, scores):
+        self.skills = skills
+        self.titles = titles
+        self.levels = levels
+        self.resume_ids = list(resume_ids)
+        self.jd_ids = list(jd_ids)
+        self.resume_skills = resume_skills
+        self.resume_experience = resume_experience
+        self.jd_skills = jd_skills
+        self.jd_titles = jd_titles
+        self.jd_experience = jd_experience
+        self.scores = scores
+
+    @staticmethod
+    def _bits(column, i):
+        row = column[i]
+        if isinstance(row, int):
+            return row
+        return int.from_bytes(row.astype('<u8').tobytes(), 'little')
+
+    def pair(self, i, j):
+        """Decode one (resume i, job description j) result into an /analyze-style dict"""
+        resume_bits = self._bits(self.resume_skills, i)
+        jd_bits = self._bits(self.jd_skills, j)
+        return {
+            "resume_id": self.resume_ids[i],
+            "jd_id": self.jd_ids[j],
+            "match_score": int(self.scores[i][j]),
+            "matched_skills": self.skills.decode(resume_bits & jd_bits),
+            "missing_skills": self.skills.decode(jd_bits & ~resume_bits),
+            "extra_skills": self.skills.decode(resume_bits & ~jd_bits),
+            "job_titles": self.titles.decode(self._bits(self.jd_titles, j)),
+            "experience_level": self.levels.names[int(self.jd_experience[j])],
+            "resume_experience_level": self.levels.names[int(self.resume_experience[i])]
+        }
+
+    def pairs(self):
+        """Yield every pair result, resume-major"""
+        for i in range(len(self.resume_ids)):
+            for j in range(len(self.jd_ids)):
+                yield self.pair(i, j)
+
+    def skill_matrix(self, which='resume'):
+        """Boolean (rows x vocabulary) matrix of skills for 'resume' or 'jd' rows (requires numpy)"""
+        np = _require_numpy()
+        column = self.resume_skills if which == 'resume' else self.jd_skills
+        words = _as_word_array(column, self.skills.words)
+        bits = np.unpackbits(words.view(np.uint8), axis=1, bitorder='little')
+        return bits[:, :len(self.skills)].astype(bool)
+
+    # Compact JSON
+
+    def to_compact(self):
+        """Plain dict with skills as integer id lists into the shared vocabulary"""
+        def id_lists(column, count):
+            return [_bitset_id_list(self._bits(column, i)) for i in range(count)]
+
+        return {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "vocabulary": list(self.skills.names),
+            "title_vocabulary": list(self.titles.names),
+            "experience_levels": list(self.levels.names),
+            "resumes": {
+                "ids": self.resume_ids,
+                "skills": id_lists(self.resume_skills, len(self.resume_ids)),
+                "experience": [int(x) for x in self.resume_experience]
+            },
+            "jds": {
+                "ids": self.jd_ids,
+                "skills": id_lists(self.jd_skills, len(self.jd_ids)),
+                "titles": id_lists(self.jd_titles, len(self.jd_ids)),
+                "experience": [int(x) for x in self.jd_experience]
+            },
+            "scores": [[int(score) for score in row] for row in self.scores]
+        }
+
+    @classmethod
+    def from_compact(cls, data):
+        _check_header(data.get("format"), data.get("version"))
+
+        def bitsets(id_lists):
+            return [sum(1 << i for i in ids) for ids in id_lists]
+
+        return cls(
+            skills=Vocabulary(data["vocabulary"]),
+            titles=Vocabulary(data["title_vocabulary"]),
+            levels=Vocabulary(data["experience_levels"]),
+            resume_ids=data["resumes"]["ids"],
+            jd_ids=data["jds"]["ids"],
+            resume_skills=bitsets(data["resumes"]["skills"]),
+            resume_experience=data["resumes"]["experience"],
+            jd_skills=bitsets(data["jds"]["skills"]),
+            jd_titles=bitsets(data["jds"]["titles"]),
+            jd_experience=data["jds"]["experience"],
+            scores=data["scores"]
+        )
+
+    # NumPy .npz
+
+    def to_npz(self):
+        """Serialize to compressed .npz bytes"""
+        np = _require_numpy()
+        out = io.BytesIO()
+        np.savez_compressed(
+            out,
+            format=np.array([FORMAT_NAME]),
+            version=np.array(FORMAT_VERSION, dtype=np.uint16),
+            vocabulary=np.array(self.skills.names, dtype=str),
+            title_vocabulary=np.array(self.titles.names, dtype=str),
+            experience_levels=np.array(self.levels.names, dtype=str),
+            resume_ids=np.array(self.resume_ids, dtype=str),
+            jd_ids=np.array(self.jd_ids, dtype=str),
+            resume_skills=_as_word_array(self.resume_skills, self.skills.words),
+            resume_experience=np.asarray(self.resume_experience, dtype=np.uint16),
+            jd_skills=_as_word_array(self.jd_skills, self.skills.words),
+            jd_titles=_as_word_array(self.jd_titles, self.titles.words),
+            jd_experience=np.asarray(self.jd_experience, dtype=np.uint16),
+            scores=np.asarray(self.scores, dtype=np.uint8).reshape(len(self.resume_ids), len(self.jd_ids))
+        )
+        return out.getvalue()
+
+    @classmethod
+    def from_npz(cls, source):
+        np = _require_numpy()
+        with np.load(source, allow_pickle=False) as data:
+            _check_header(str(data["format"][0]), int(data["version"]))
+            return cls(
+                skills=Vocabulary(data["vocabulary"].tolist()),
+                titles=Vocabulary(data["title_vocabulary"].tolist()),
+                levels=Vocabulary(data["experience_levels"].tolist()),
+                resume_ids=data["resume_ids"].tolist(),
+                jd_ids=data["jd_ids"].tolist(),
+                resume_skills=data["resume_skills"],
+                resume_experience=data["resume_experience"],
+                jd_skills=data["jd_skills"],
+                jd_titles=data["jd_titles"],
+                jd_experience=data["jd_experience"],
+                scores=data["scores"]
+            )
+
+
+def _as_word_array(column, words):
+    """Convert a column of int bitsets (or an existing word array) to a (rows, words) uint64 array"""
+    np = _require_numpy()
+    if not isinstance(column, list):
+        return np.asarray(column, dtype='<u8')
+    buffer = b''.join(bits.to_bytes(words * 8, 'little') for bits in column)
+    return np.frombuffer(buffer, dtype='<u8').reshape(len(column), words)
+
+
+def _check_header(name, version):
+    if name != FORMAT_NAME:
+        raise ValueError("not a bulk scores file")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"unsupported bulk scores version {version}")
+
+
+def load_bulk_scores(source):
+    """Load bulk scores from a path, raw bytes, binary file object or compact dict
+
+    The encoding is detected from the content: .npz files are zip archives,
+    anything else is parsed as compact JSON.
+    """
+    if isinstance(source, dict):
+        return BulkScores.from_compact(source)
+    if isinstance(source, str):
+        with open(source, 'rb') as fh:
+            source = fh.read()
+    elif hasattr(source, 'read'):
+        source = source.read()
+    if source[:2] == b'PK':
+        return BulkScores.from_npz(io.BytesIO(source))
+    return BulkScores.from_compact(json.loads(source))
@@ -0,0 +1,31 @@
+"""Tests for the bounded ASGI executor"""
+
+import asyncio
+import os
+
+import pytest
+
+import asgi
+
+
+def exit_abruptly():
+    os._exit(1)
+
+
+def worker_pid():
+    return os.getpid()
+
+
+def test_process_pool_is_replaced_after_a_worker_dies():
+    executor = asgi.BoundedExecutor(workers=1)
+
+    async def run():
+        with pytest.raises(asgi.WorkerLost):
+            await executor.submit(exit_abruptly)
+        return await executor.submit(worker_pid)
+
+    try:
+        assert asyncio.run(run()) != os.getpid()
+    finally:
+        executor.shutdown()
+    assert executor.outstanding == 0
@@ -0,0 +1,115 @@
+"""Regression tests for the PDF page text cache"""
+
+import io
+
+import pytest
+from PyPDF2 import PageObject, PdfReader, PdfWriter
+from PyPDF2.generic import (ArrayObject, DecodedStreamObject, DictionaryObject,
+                            FloatObject, NameObject)
+
+import app
+import loadtest
+
+
+def _stream(data, **entries):
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    for key, value in entries.items():
+        stream[NameObject('/' + key)] = value
+    return stream
+
+
+def xobject_only_pdf(text):
+    """One page whose content is just 'q /Fm0 Do Q'; the text lives in a form XObject"""
+    writer = PdfWriter()
+    page = PageObject.create_blank_page(width=612, height=792)
+    font = DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica'),
+    })
+    form = _stream(
+        f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode(),
+        Type=NameObject('/XObject'),
+        Subtype=NameObject('/Form'),
+        BBox=ArrayObject([FloatObject(0), FloatObject(0), FloatObject(612), FloatObject(792)]),
+        Resources=DictionaryObject({
+            NameObject('/Font'): DictionaryObject({NameObject('/F1'): writer._add_object(font)})
+        }),
+    )
+    page[NameObject('/Resources')] = DictionaryObject({
+        NameObject('/XObject'): DictionaryObject({NameObject('/Fm0'): writer._add_object(form)})
+    })
+    page[NameObject('/Contents')] = writer._add_object(_stream(b"q /Fm0 Do Q"))
+    writer.add_page(page)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def empty_page_cache(monkeypatch):
+    monkeypatch.setattr(app, 'PDF_PAGE_CACHE', app.LRUCache(
+        'PDF_PAGE_CACHE_MAX_BYTES', 'PDF_PAGE_CACHE_MAX_ENTRIES', app.sys.getsizeof))
+
+
+def test_xobject_only_pages_do_not_share_cached_text():
+    alice = xobject_only_pdf("Alice Smith python kubernetes")
+    bob = xobject_only_pdf("Bob Jones java oracle")
+    with app.app.app_context():
+        assert "Alice" in app.extract_pdf_text(alice)
+        text = app.extract_pdf_text(bob)
+    assert "Bob" in text
+    assert "Alice" not in text
+
+
+def test_reupload_is_served_from_cache():
+    data = xobject_only_pdf("Alice Smith python kubernetes")
+    with app.app.app_context():
+        first = app.extract_pdf_text(data)
+        hits = app.PDF_PAGE_CACHE.stats()['hits']
+        assert app.extract_pdf_text(data) == first
+        assert app.PDF_PAGE_CACHE.stats()['hits'] == hits + 1
+
+
+def numbered_pdf(pages):
+    lines = [f"page {p} line {i} python" for p in range(pages) for i in range(45)]
+    return loadtest.build_pdf("\n".join(lines), pages=pages)
+
+
+def serial_text(data):
+    return ''.join(page.extract_text() for page in PdfReader(io.BytesIO(data)).pages)
+
+
+def test_appended_page_reextracts_only_the_new_page():
+    with app.app.app_context():
+        app.extract_pdf_text(numbered_pdf(5))
+        before = app.PDF_PAGE_CACHE.stats()
+        text = app.extract_pdf_text(numbered_pdf(6))
+        after = app.PDF_PAGE_CACHE.stats()
+    assert text == serial_text(numbered_pdf(6))
+    assert after['misses'] - before['misses'] == 1
+    assert after['hits'] - before['hits'] == 5
+
+
+def test_shared_font_is_hashed_once_per_document():
+    reader = PdfReader(io.BytesIO(numbered_pdf(3)))
+    hasher = app._PdfObjectHasher()
+    fingerprints = [app.pdf_page_fingerprint(page, hasher) for page in reader.pages]
+    assert None not in fingerprints and len(set(fingerprints)) == 3
+    # The font dictionary (3 0 R) is shared by every page and memoised as an indirect object
+    assert (3, 0) in hasher.memo
+
+
+def test_parallel_extraction_keeps_page_order(monkeypatch):
+    monkeypatch.setitem(app.app.config, 'PDF_PARALLEL_MIN_PAGES', 2)
+    monkeypatch.setitem(app.app.config, 'PDF_EXTRACT_WORKERS', 2)
+    data = numbered_pdf(7)
+    try:
+        with app.app.app_context():
+            text = app.extract_pdf_text(data)
+        # The pool is dropped on BrokenProcessPool, so it still existing means no serial fallback
+        assert app._pdf_executor is not None
+    finally:
+        app._reset_pdf_executor()
+    assert text == serial_text(data)
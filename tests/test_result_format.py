@@ -0,0 +1,77 @@
+"""Round trips of bulk scoring results through every output format"""
+
+import io
+import json
+
+import pytest
+
+import app
+from result_format import FORMAT_VERSION, BulkScores, Vocabulary, load_bulk_scores
+
+
+def bulk_run(skill_count=150, titles=()):
+    """3 resumes x 2 job descriptions over skill_count skills (several uint64 words per bitset)"""
+    skills = Vocabulary(f"skill-{i}" for i in range(skill_count))
+    title_vocabulary = Vocabulary(titles)
+    levels = Vocabulary(["Not specified", "2 years", "5 years"])
+    resume_skills = [skills.bitset(["skill-0", "skill-63", "skill-64", f"skill-{skill_count - 1}"]),
+                     skills.bitset(["skill-1", "skill-128"]),
+                     0]
+    jd_skills = [skills.bitset(["skill-0", "skill-64", "skill-65"]),
+                 skills.bitset(["skill-128", f"skill-{skill_count - 1}"])]
+    jd_titles = [title_vocabulary.bitset(titles[:1]), 0]
+    return BulkScores(skills, title_vocabulary, levels, ["a.pdf", "b.docx", "c.txt"], ["0", "1"],
+                      resume_skills, [2, 0, 1], jd_skills, jd_titles, [1, 0],
+                      [[67, 45], [0, 45], [5, 0]])
+
+
+@pytest.mark.parametrize("titles", [(), ("backend engineer", "data scientist")])
+def test_every_format_decodes_the_same_pairs(titles):
+    run = bulk_run(titles=titles)
+    expected = list(run.pairs())
+    assert expected[0]["matched_skills"] == ["skill-0", "skill-64"]
+    assert expected[0]["extra_skills"] == ["skill-63", "skill-149"]
+
+    as_json = json.loads(json.dumps({"results": expected}))["results"]
+    compact = load_bulk_scores(json.dumps(run.to_compact()).encode('utf-8'))
+    assert as_json == expected
+    assert list(compact.pairs()) == expected
+
+    pytest.importorskip("numpy")
+    npz = load_bulk_scores(run.to_npz())
+    assert list(npz.pairs()) == expected
+    assert list(load_bulk_scores(io.BytesIO(run.to_npz())).pairs()) == expected
+
+
+def test_skill_matrix_matches_the_bitsets():
+    pytest.importorskip("numpy")
+    run = load_bulk_scores(bulk_run().to_npz())
+    matrix = run.skill_matrix('resume')
+    assert matrix.shape == (3, 150)
+    assert [run.skills.names[i] for i in matrix[0].nonzero()[0]] == ["skill-0", "skill-63", "skill-64", "skill-149"]
+
+
+def test_newer_versions_are_rejected():
+    data = bulk_run().to_compact()
+    data["version"] = FORMAT_VERSION + 1
+    with pytest.raises(ValueError):
+        load_bulk_scores(data)
+
+
+def test_bulk_endpoint_formats_agree():
+    def post(output_format):
+        data = {"format": output_format, "jd_id": ["backend", "data"],
+                "jd_text": ["Senior python developer, django and aws, 5+ years experience",
+                            "Data scientist with pandas, sql and machine learning"],
+                "resume_file": [(io.BytesIO(b"python django aws docker, 6 years experience"), "a.txt"),
+                                (io.BytesIO(b"sql pandas machine learning tableau"), "b.txt")]}
+        response = app.app.test_client().post('/score/bulk', data=data)
+        assert response.status_code == 200
+        return response.data
+
+    expected = json.loads(post("json"))["results"]
+    assert [(pair["resume_id"], pair["jd_id"]) for pair in expected] == [
+        ("a.txt", "backend"), ("a.txt", "data"), ("b.txt", "backend"), ("b.txt", "data")]
+    assert list(load_bulk_scores(post("compact")).pairs()) == expected
+    pytest.importorskip("numpy")
+    assert list(load_bulk_scores(post("npz")).pairs()) == expected
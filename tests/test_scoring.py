@@ -0,0 +1,29 @@
+"""Tests for section-aware match scoring"""
+
+import app
+
+JD = "python java docker kubernetes terraform"
+
+
+def score(resume_text):
+    return app.calculate_match(resume_text, JD)[0]
+
+
+def test_partial_coverage_scores_below_full_coverage():
+    full = score("Jane Doe\nExperience\nBuilt python java docker kubernetes terraform systems")
+    partial = score("Jane Doe\nExperience\nBuilt python java docker kubernetes systems")
+    assert partial < full
+
+
+def test_missing_skill_costs_more_than_the_section_bonus():
+    listed = score("Jane Doe\nSkills\npython, java, docker, kubernetes, terraform")
+    partial = score("Jane Doe\nExperience\nBuilt python java docker kubernetes systems")
+    assert partial < listed
+
+
+def test_listed_skills_score_like_unsectioned_text():
+    assert score("Jane Doe\nSkills\npython, java, docker") == score("Jane Doe python java docker")
+
+
+def test_experience_earns_a_bonus_over_listed_skills():
+    assert score("Jane Doe\nExperience\nBuilt python java docker") > score("Jane Doe\nSkills\npython, java, docker")
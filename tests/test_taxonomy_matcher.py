@@ -0,0 +1,67 @@
+"""TaxonomyMatcher must find exactly what a word-bounded search per variation finds"""
+
+import random
+import re
+
+import pytest
+
+import app
+
+
+def reference(taxonomy, text):
+    """The original per-variation search"""
+    return {key for key, variations in taxonomy.items()
+            if any(re.search(r'\b' + re.escape(variation) + r'\b', text) for variation in variations)}
+
+
+# Variations that are prefixes of each other, or start or end with a non-word character
+OVERLAPPING = {
+    'programming': {
+        'c': ['c'],
+        'cpp': ['c++', 'cpp'],
+        'csharp': ['c#', 'c sharp'],
+        'dotnet': ['.net', 'asp.net', 'net core'],
+        'node': ['node', 'node.js', 'nodejs'],
+        'java': ['java'],
+        'javascript': ['javascript', 'java script', 'js'],
+        'go': ['go', 'golang', 'go lang'],
+        'r': ['r'],
+        'react': ['react', 'react native', 'react.js']
+    }
+}
+OVERLAPPING_TITLES = {'engineer': ['engineer', 'engineer ii'], 'dev': ['dev', 'developer', 'dev ops']}
+
+EDGE_CASES = [
+    "c++ and c# and c", "c++c", "cc++", "c+++", "(c++)", "c++.net", "asp.net core", ".net",
+    "x.net", "net core", "node.js developer", "node.jsx", "nodejs", "node", "node.", "java-script",
+    "javascript java", "java script", "js.", "golang go lang", "gopher", "r&d", "r,", "react.js native",
+    "react native", "engineer ii", "engineerii", "dev ops developer", "devops", "", "+", "#", ".",
+]
+
+
+def random_texts(vocabulary, seed, count=300):
+    rng = random.Random(seed)
+    noise = ['x', '.', '-', '+', '#', ',', '(', ')', 'java-script', 'node.jsx', 'c+', '.net5']
+    return [' '.join(rng.choice(vocabulary + noise) for _ in range(rng.randint(1, 40)))
+            + rng.choice(['', '.', '+', ' '])
+            for _ in range(count)]
+
+
+def flatten(skills_db):
+    return {key: variations for skills in skills_db.values() for key, variations in skills.items()}
+
+
+@pytest.mark.parametrize("skills_db,job_titles", [
+    (app.SKILLS_DB, app.JOB_TITLES),
+    (OVERLAPPING, OVERLAPPING_TITLES),
+])
+def test_matcher_agrees_with_per_variation_search(skills_db, job_titles):
+    matcher = app.TaxonomyMatcher(skills_db, job_titles)
+    skills = flatten(skills_db)
+    vocabulary = [v for variations in skills.values() for v in variations]
+    vocabulary += [v for variations in job_titles.values() for v in variations]
+    for raw in EDGE_CASES + random_texts(vocabulary, seed=len(vocabulary)):
+        # preprocess_text drops '+' and '#', so raw lowercase text is checked too
+        for text in (app.preprocess_text(raw), raw.lower()):
+            assert matcher.find_skills(text) == reference(skills, text), text
+            assert matcher.find_titles(text) == reference(job_titles, text), text
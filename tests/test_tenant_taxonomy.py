@@ -0,0 +1,51 @@
+"""Tests for tenant taxonomy overlays"""
+
+import json
+import os
+
+import pytest
+
+import app
+
+ELIXIR = {"skills": {"programming": {"elixir": ["elixir"]}}}
+
+
+@pytest.fixture(autouse=True)
+def tenant_folder(tmp_path, monkeypatch):
+    monkeypatch.setitem(app.app.config, 'TENANT_TAXONOMY_FOLDER', str(tmp_path))
+    monkeypatch.setattr(app, 'TENANT_OVERLAYS', {})
+    monkeypatch.setattr(app, 'MATCHER_CACHE', app.LRUCache(
+        'TENANT_CACHE_MAX_BYTES', 'TENANT_CACHE_MAX_ENTRIES', lambda matcher: matcher.size))
+    return tmp_path
+
+
+def skills(tenant_id):
+    return app.get_matcher(tenant_id).find_skills("elixir and python")
+
+
+def test_edited_overlay_file_is_picked_up(tenant_folder):
+    path = tenant_folder / "acme.json"
+    path.write_text(json.dumps({"remove_skills": ["elixir"]}))
+    assert "elixir" not in skills("acme")
+    path.write_text(json.dumps(ELIXIR))
+    # Make the edit visible even on filesystems with coarse timestamps
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert "elixir" in skills("acme")
+
+
+def test_deleted_overlay_file_makes_the_tenant_unknown(tenant_folder):
+    path = tenant_folder / "acme.json"
+    path.write_text(json.dumps(ELIXIR))
+    skills("acme")
+    path.unlink()
+    with pytest.raises(KeyError):
+        app.get_matcher("acme")
+
+
+def test_sync_tenant_overlays_mirrors_registrations():
+    app.sync_tenant_overlays({"acme": ELIXIR})
+    assert "elixir" in skills("acme")
+    app.sync_tenant_overlays({})
+    with pytest.raises(KeyError):
+        app.get_matcher("acme")